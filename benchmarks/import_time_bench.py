@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Benchmark how long importing ``bluecore_models`` modules takes.
+
+Imports each module in a fresh interpreter under ``python -X importtime``,
+several times, and reports the median cumulative import time of the module
+along with the slowest modules it pulled in:
+
+    uv run python benchmarks/import_time_bench.py --runs 10
+
+Every Airflow task and API worker imports the models, so the models shouldn't
+import what only reading or writing RDF needs. ``--forbid`` names modules that
+importing must not load (by default pyld and rdflib for ``bluecore_models.models``)
+and ``--max-ms`` a median to stay under; the script exits non-zero if either is
+broken, so it can guard against regressions in CI.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = ["bluecore_models.models", "bluecore_models.bluecore_graph"]
+DEFAULT_FORBID = {"bluecore_models.models": ["pyld", "rdflib"]}
+
+
+def import_times(module: str) -> tuple[dict[str, int], set[str]]:
+    """
+    The cumulative import time in microseconds of module and of everything
+    importing it imported, in a fresh interpreter, and the top-level packages
+    it left in sys.modules.
+    """
+    code = (
+        f"import sys, {module}\n"
+        "print(' '.join(sorted({m.split('.')[0] for m in sys.modules})))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times, set(result.stdout.split())
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    ap.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    ap.add_argument("--runs", type=int, default=5, help="imports per module")
+    ap.add_argument("--top", type=int, default=10, help="slowest imports to show")
+    ap.add_argument(
+        "--forbid",
+        action="append",
+        metavar="MODULE=PACKAGE[,PACKAGE]",
+        help="packages importing MODULE must not load",
+    )
+    ap.add_argument("--max-ms", type=float, help="fail if a median import takes longer")
+    args = ap.parse_args()
+
+    forbid = dict(DEFAULT_FORBID)
+    for rule in args.forbid or []:
+        module, packages = rule.split("=")
+        forbid[module] = packages.split(",")
+
+    failed = False
+    for module in args.modules:
+        runs = [import_times(module) for _ in range(args.runs)]
+        median = statistics.median(times[module] for times, _ in runs) / 1000
+        print(f"\n{module}: {median:.1f}ms (median of {args.runs})")
+
+        slowest = sorted(
+            ((statistics.median(t.get(name, 0) for t, _ in runs), name))
+            for name in runs[0][0]
+            if name != module
+        )[-args.top :]
+        for micros, name in reversed(slowest):
+            print(f"  {micros / 1000:8.1f}ms  {name}")
+
+        loaded = sorted(set(forbid.get(module, [])) & runs[0][1])
+        if loaded:
+            print(f"  FAIL: importing {module} loads {', '.join(loaded)}")
+            failed = True
+        if args.max_ms is not None and median > args.max_ms:
+            print(f"  FAIL: {median:.1f}ms is over {args.max_ms:.1f}ms")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
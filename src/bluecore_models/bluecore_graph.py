@@ -1,29 +1,79 @@
+import cProfile
 import datetime
+import itertools
 import json
 import logging
-from uuid import uuid4
+import os
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, NamedTuple
+from uuid import NAMESPACE_URL, UUID, uuid4, uuid5
 
 from psycopg2 import errors as psycopg2_errors
 from rdflib import XSD, BNode, Graph, IdentifiedNode, Literal, Namespace, Node, URIRef
-from sqlalchemy import func
+from sqlalchemy import (
+    Integer,
+    Text,
+    any_,
+    bindparam,
+    column,
+    delete,
+    insert,
+    literal_column,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm.session import Session, sessionmaker
-from tenacity import Retrying, retry_if_exception, stop_after_attempt
+from tenacity import (
+    Retrying,
+    retry_if_exception,
+    retry_if_exception_type,
+    stop_after_attempt,
+)
 
 from bluecore_models.models import (
     BibframeOtherResources,
     Hub,
     Instance,
     OtherResource,
+    ResourceBase,
+    ResourceSource,
     Work,
 )
 from bluecore_models.models.version import CURRENT_USER_ID
 from bluecore_models.namespaces import BF, BFLC, MADS, RDF, RDFS
+from bluecore_models.utils import metrics
+from bluecore_models.utils.db import (
+    StoredResource,
+    add_bf_classes,
+    add_versions,
+    insert_sources,
+    replace_sources,
+    update_bf_classes,
+)
 from bluecore_models.utils.graph import (
+    EntityView,
+    FramedJsonLD,
+    Triple,
+    describe_entity,
+    entity_statements,
     find_duplicate_bnode_values,
-    generate_entity_graph,
-    replace_uri,
+    frame_graph,
+    frame_triples,
+    group_statements,
+    replace_uris,
 )
+from bluecore_models.utils.sql_profile import StatementProfile, statement_stats
+from bluecore_models.utils.store import compact_graph
+from bluecore_models.utils.uuids import uuid7
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +91,9 @@ RETRYABLE_PG_ERRORS = (
 # How many times to attempt save() before giving up on serialization failures.
 SAVE_MAX_ATTEMPTS = 3
 
+# How many resources at a time save() hands each worker of an executor to frame.
+FRAME_CHUNKSIZE = 16
+
 # Default AdminMetadata values used when a caller doesn't override them.
 DEFAULT_STATUS = URIRef("http://id.loc.gov/vocabulary/mstatus/c")
 DEFAULT_AGENT = URIRef("http://id.loc.gov/vocabulary/organizations/cbc")
@@ -80,6 +133,21 @@ class DuplicateValueError(BluecoreGraphError):
     """
 
 
+class SourceConflictError(BluecoreGraphError):
+    """Raised when another save claimed a source this one minted a resource for.
+
+    owners maps the URI minted here to the one the other save minted, which
+    save() adopts before trying again.
+    """
+
+    def __init__(self, owners: dict[IdentifiedNode, URIRef]):
+        super().__init__(
+            "sources already claimed: "
+            + ", ".join(f"{minted} by {owner}" for minted, owner in owners.items())
+        )
+        self.owners = owners
+
+
 # (predicate, rdf:type) pairs identifying blank nodes that are stripped out of
 # a resource's graph before it is persisted to the database, e.g. removing
 # OCLC number identifiers that shouldn't be exposed.
@@ -87,6 +155,112 @@ EXCLUDED_TRIPLE_TYPES = [
     (BF.identifiedBy, BF.OclcNumber),
 ]
 
+# How the UUIDs of minted URIs are made, see BluecoreGraph.
+MINTING = ("random", "name", "time")
+
+
+class EntityPartition(NamedTuple):
+    """The subgraphs of each kind of resource in a graph, see _partition."""
+
+    hubs: list[EntityView]
+    works: list[EntityView]
+    instances: list[EntityView]
+    others: list[EntityView]
+
+
+class SavePlan(NamedTuple):
+    """
+    What a save writes, as far as it can be worked out from the graph: made once
+    by _plan and applied by _apply on every attempt, so a retry only has to run
+    the SQL again.
+    """
+
+    # the Bluecore URI each resource that arrived without one was given
+    renames: dict[IdentifiedNode, URIRef]
+    # for each kind, in the order they are written: its class, its model, whether
+    # it is written authoritatively (see _persist_resources), and its resources
+    # with their subgraphs, in the order they are written
+    resources: list[
+        tuple[
+            URIRef | None,
+            type[ResourceBase],
+            bool,
+            list[tuple[IdentifiedNode, EntityView]],
+        ]
+    ]
+    # the (instance, work) pairs to link, in the order they are linked
+    instance_links: list[tuple[IdentifiedNode, IdentifiedNode]]
+    # the Works and Instances whose links to Other Resources are replaced
+    bibframe_resources: list[tuple[URIRef, type, IdentifiedNode]]
+    # each Other Resource with the Works and Instances whose subgraphs mention it
+    other_links: list[tuple[IdentifiedNode, list[tuple[URIRef, type, IdentifiedNode]]]]
+    # the framed JSON-LD of each resource by uri, filled in as it is first written
+    framed: dict[str, FramedJsonLD]
+
+
+class PhaseTime(NamedTuple):
+    """Wall clock and CPU seconds spent in one phase of a save."""
+
+    wall: float
+    cpu: float
+
+
+class SaveReport(NamedTuple):
+    """
+    What a BluecoreGraph.save did and where its time went, for monitoring.
+
+    phases has the time spent in each phase, in the order they first ran:
+    check_duplicates, strip, mint and plan, then the database phases persist,
+    frame, flush, link and commit, whose times are added up over every attempt.
+    A phase's time leaves out that of a phase run inside it (frame, inside
+    persist). CPU time is this process's, so framing done by an executor's
+    workers isn't counted in it.
+
+    The resource and link counts are those of the attempt that committed:
+    inserted and updated resources were written, unchanged ones were written
+    with the data they already had, and kept ones were left alone (see
+    _persist_resources). resources breaks them down by the table of the kind
+    of resource, then by what was done. errors names the Postgres error behind
+    each attempt that was retried.
+
+    statements has the SQL run by the save, every attempt of it, by shape of
+    statement; it is empty unless a StatementProfiler is listening to the
+    engine (see utils.sql_profile).
+    """
+
+    triples: int
+    wall: float
+    cpu: float
+    phases: dict[str, PhaseTime]
+    inserted: int
+    updated: int
+    unchanged: int
+    kept: int
+    links: int
+    resources: dict[str, dict[str, int]]
+    attempts: int
+    errors: list[str]
+    statements: StatementProfile
+
+
+class SlowSave(NamedTuple):
+    """
+    What to do about a save that takes longer than seconds, wall clock: it is
+    always logged, as a JSON record of its source, the primary_class and
+    update_other_resources it was made with, its graph size and SaveReport. One
+    that fails after that long is logged too, with its error and what there is
+    of a report.
+
+    Given a directory, the graph as it was passed in is written there as
+    N-Triples too, for benchmarks/save_graph_bench.py --input to replay. With
+    profile as well, every save is run under cProfile -- which slows it down --
+    and the profile of a slow one is written there as a .pstats file.
+    """
+
+    seconds: float
+    directory: str | os.PathLike | None = None
+    profile: bool = False
+
 
 def _is_retryable_pg_error(error: BaseException) -> bool:
     """
@@ -99,6 +273,18 @@ def _is_retryable_pg_error(error: BaseException) -> bool:
     )
 
 
+def _class_name(primary_class) -> str | None:
+    """
+    What a save's primary_class was, for logging: the local name of the BIBFRAME
+    class ("Work", "Instance", "Hub") or of the model ("OtherResource").
+    """
+    if primary_class is None:
+        return None
+    if isinstance(primary_class, URIRef):
+        return primary_class.removeprefix(str(BF))
+    return primary_class.__name__
+
+
 def save_graph(
     session_maker: sessionmaker,
     graph: Graph,
@@ -106,6 +292,12 @@ def save_graph(
     primary_class=None,
     update_other_resources: bool = True,
     source: str | None = None,
+    executor: Executor | None = None,
+    compact: bool = False,
+    on_report: Callable[[SaveReport], None] | None = None,
+    slow: SlowSave | None = None,
+    minting: str = "random",
+    bulk: bool = False,
 ) -> Graph:
     """
     Use the supplied database sessionmaker to create a database session and
@@ -132,16 +324,72 @@ def save_graph(
     only used in log messages and errors, so that a rejected payload can be traced
     back to the thing that produced it. Worth passing when loading in bulk, where
     the resource URIs in a message may not identify the file they arrived in.
+
+    executor, if given, frames the JSON-LD of the resources being written in
+    parallel; see BluecoreGraph.save.
+
+    compact works on a copy of the graph held in an ArrayStore, rather than on
+    the graph itself; see BluecoreGraph. The copy is what is returned.
+
+    on_report, if given, is called with the SaveReport of the save once it has
+    committed.
+
+    slow, if given, says how long a save can take before it is logged, and what
+    is kept of it; see SlowSave.
+
+    minting says how the URIs of new resources are minted; see BluecoreGraph.
+
+    bulk writes each kind of resource with one INSERT ... ON CONFLICT statement
+    rather than through the ORM; see BluecoreGraph.save.
     """
-    bg = BluecoreGraph(graph, namespace, source=source)
-    bg.save(
+    bg = BluecoreGraph(
+        graph, namespace, source=source, compact=compact, minting=minting
+    )
+    report = bg.save(
         session_maker,
         primary_class=primary_class,
         update_other_resources=update_other_resources,
+        executor=executor,
+        slow=slow,
+        bulk=bulk,
     )
+    if on_report is not None:
+        on_report(report)
     return bg.graph
 
 
+def _record_metrics(report: SaveReport) -> None:
+    """Report a committed save into the metrics registry."""
+    registry = metrics.get_registry()
+    registry.counter(
+        "bluecore_saves_total", "Graph saves, by outcome.", ["outcome"]
+    ).inc(outcome="committed")
+    registry.histogram(
+        "bluecore_save_duration_seconds", "Wall clock time of committed graph saves."
+    ).observe(report.wall)
+    phase_duration = registry.histogram(
+        "bluecore_save_phase_duration_seconds",
+        "Wall clock time of each phase of committed graph saves.",
+        ["phase"],
+    )
+    for phase, timing in report.phases.items():
+        phase_duration.observe(timing.wall, phase=phase)
+    resources = registry.counter(
+        "bluecore_save_resources_total",
+        "Resources in committed graph saves, by table and what was done with them.",
+        ["kind", "outcome"],
+    )
+    for kind, outcomes in report.resources.items():
+        for outcome, n in outcomes.items():
+            resources.inc(n, kind=kind, outcome=outcome)
+    registry.counter(
+        "bluecore_save_links_total", "Links written by committed graph saves."
+    ).inc(report.links)
+    registry.counter(
+        "bluecore_save_triples_total", "Triples in the graphs of committed saves."
+    ).inc(report.triples)
+
+
 class BluecoreGraph:
     """
     The BluecoreGraph is instantiated using an existing rdflib Graph for a set
@@ -172,12 +420,34 @@ class BluecoreGraph:
         graph: Graph,
         namespace: str = "https://bcld.info/",
         source: str | None = None,
+        compact: bool = False,
+        minting: str = "random",
     ):
         """
         Instantiate a BluecoreGraph using an rdflib Graph, and an optional
         Bluecore Namespace URL: the default is https://bcld.info. source names where
         the graph came from and is used only in log messages (see save_graph).
-        """
+
+        With compact True the graph is copied into an ArrayStore and worked on
+        there, which for a large record takes less memory and answers lookups
+        faster than rdflib's Memory store. The supplied graph is then left as
+        it is, and self.graph is the copy.
+
+        minting is how the UUID of a minted URI is made. "random" (uuid4) is the
+        default. With "name" a resource with an external URI gets a UUID derived
+        from the namespace, its class and that URI (uuid5), so every save of
+        it, by any worker, mints the same URI for it; one without (a blank
+        node) still gets a random one. With "time" UUIDs are time-ordered
+        (uuid7, see utils.uuids), so new resources are added at the end of
+        the uuid and uri indexes rather than all over them. Resources already
+        saved are found under their derivedFrom URI whichever way they were
+        minted.
+        """
+        if minting not in MINTING:
+            raise BluecoreGraphError(
+                f"minting must be one of {', '.join(MINTING)}, got {minting}"
+            )
+        self.minting = minting
         if not isinstance(namespace, str):
             raise TypeError(f"default namespace cannot be {namespace}")
         elif not namespace.startswith("http"):
@@ -187,16 +457,21 @@ class BluecoreGraph:
         elif not namespace.endswith("/"):
             namespace += "/"
         self.namespace = Namespace(namespace)
-        self.graph = graph
+        self.graph = compact_graph(graph) if compact else graph
         self.source = source
         # The per-entity subgraph extractions (works/instances/hubs/others) are
-        # expensive and get called repeatedly across the save. We cache them keyed
-        # on _revision, which is bumped every time the graph is mutated so the
-        # cache can't go stale. Every mutation of self.graph funnels through
-        # _infer (once, here) and _switch_uris (during minting) -- keep it that
-        # way, or bump _revision at any new mutation site (see _bump_revision).
+        # expensive and get called repeatedly across the save. _partition makes
+        # all four in one pass and we cache them keyed on _revision, which is
+        # bumped every time the graph is mutated so the cache can't go stale.
+        # Every mutation of self.graph funnels through _infer (once, here) and
+        # _switch_uris (during minting), which patches the cache rather than
+        # dropping it -- keep it that way, or bump _revision at any new mutation
+        # site (see _bump_revision).
         self._revision = 0
-        self._subgraph_cache: dict[str, tuple[int, list[Graph]]] = {}
+        self._subgraph_cache: dict[str, tuple[int, list[EntityView]]] = {}
+        # The distinct subjects of self.graph, for the membership test in
+        # _partition. Cached on _revision like the subgraphs above.
+        self._subject_index: tuple[int, set[Node]] | None = None
         # Whether this save should tell described resources from stubs,
         # which ones arrived described, and what each minted uri was called
         # beforehand. Set by save() and _switch_uris, see _is_stub.
@@ -205,13 +480,35 @@ class BluecoreGraph:
         self._minted_from: dict[str, str] = {}
         # Resources this save inserted, which have no existing links to protect.
         self._created: set[str] = set()
+        # What the save has done and how long it took, for the SaveReport: the
+        # resources (by table and what was done with them) and links written by
+        # the current attempt, the [wall, cpu] seconds of each phase, the phases
+        # running (with the time of the phases run inside them), and the errors
+        # attempts were retried after.
+        self._counts: Counter[tuple[str, str]] = Counter()
+        self._links = 0
+        self._timings: dict[str, list[float]] = {}
+        self._running: list[list[float]] = []
+        self._retry_errors: list[str] = []
+        self.report: SaveReport | None = None
+        # What frames the JSON-LD of the resources being written, if not us,
+        # and whether they are written with SQL rather than the ORM. Set by
+        # save().
+        self._executor: Executor | None = None
+        self._bulk = False
         # True when whoever called save() didn't name the kind of resource it
         # was writing: the API routes always do, the record loader never does.
         # So this is how we know a save came from a load. See _keep_existing.
         self._ingest = False
+        # When, and by whom, the AdminMetadata we generate says resources were
+        # described. Taken again at the start of each save.
+        self._stamp_admin_metadata()
         # Work this out before _infer, which adds the very links that would
         # make a legitimately new resource look like a nested mention.
         self._relation_stubs = self._find_relation_stubs()
+        # The triples _infer added, so that the graph can be had back as it was
+        # passed in (see save's slow).
+        self._inferred: set[Triple] = set()
         self._infer()
 
     def _find_relation_stubs(self) -> set[Node]:
@@ -245,65 +542,72 @@ class BluecoreGraph:
 
     def _bump_revision(self) -> None:
         """
-        Record that self.graph has been mutated, invalidating the subgraph cache.
+        Record that self.graph has been mutated, invalidating the subgraph cache
+        and the subject index.
         Call this from anywhere that changes self.graph.
         """
         self._revision += 1
 
-    def _subgraphs(self, key: str, compute) -> list[Graph]:
+    def _subgraphs(self, key: str) -> list[EntityView]:
         """
-        Return the cached subgraph list for `key`, recomputing it (via `compute`)
-        only when the graph has changed since it was last cached. The cache is
-        keyed on _revision, so it invalidates itself whenever the graph is mutated
-        (see _bump_revision).
+        Return the cached subgraph list for `key` ("hubs", "works", "instances" or
+        "others"), re-partitioning the graph only when it has changed since it was
+        last cached. The cache is keyed on _revision, so it invalidates itself
+        whenever the graph is mutated (see _bump_revision).
 
         The returned graphs are shared/cached -- callers must not mutate them in
         place (copy first, or bump _revision if mutating self.graph).
         """
         cached = self._subgraph_cache.get(key)
         if cached is None or cached[0] != self._revision:
-            cached = (self._revision, compute())
-            self._subgraph_cache[key] = cached
+            partition = self._partition()
+            for kind, graphs in partition._asdict().items():
+                self._subgraph_cache[kind] = (self._revision, graphs)
+            cached = self._subgraph_cache[key]
         return cached[1]
 
-    def works(self) -> list[Graph]:
+    def _subjects(self) -> set[Node]:
         """
-        Returns a list of Bibframe Work rdflib Graphs, where each graph is for a
+        Return the set of distinct subjects in self.graph, rebuilding it only when
+        the graph has changed since it was last built (see _bump_revision).
+        Checking membership in graph.subjects() directly walks the whole graph
+        each time; this makes it a set lookup.
+        """
+        if self._subject_index is None or self._subject_index[0] != self._revision:
+            self._subject_index = (self._revision, set(self.graph.subjects()))
+        return self._subject_index[1]
+
+    def works(self) -> list[EntityView]:
+        """
+        Returns a list of Bibframe Work subgraphs, where each graph is for a
         distinct Work. Excludes Hubs, which LC catalog data types as both bf:Hub
         and bf:Work; they are handled separately by hubs().
         """
-        return self._subgraphs(
-            "works",
-            lambda: [
-                generate_entity_graph(self.graph, s)
-                for s in self.graph.subjects(RDF.type, BF.Work)
-                if (s, RDF.type, BF.Hub) not in self.graph
-                and s not in self._relation_stubs
-            ],
-        )
+        return self._subgraphs("works")
 
-    def hubs(self) -> list[Graph]:
+    def hubs(self) -> list[EntityView]:
         """
-        Returns a list of Bibframe Hub rdflib Graphs, where each graph is for a
+        Returns a list of Bibframe Hub subgraphs, where each graph is for a
         distinct Hub.
         """
-        return self._subgraphs("hubs", lambda: self._extract_subgraphs(BF.Hub))
+        return self._subgraphs("hubs")
 
-    def instances(self) -> list[Graph]:
+    def instances(self) -> list[EntityView]:
         """
-        Returns a list of Bibframe Instance rdflib Graphs, where each graph is for a
+        Returns a list of Bibframe Instance subgraphs, where each graph is for a
         distinct Instance.
         """
-        return self._subgraphs(
-            "instances", lambda: self._extract_subgraphs(BF.Instance)
-        )
+        return self._subgraphs("instances")
 
-    def others(self) -> list[Graph]:
+    def others(self) -> list[EntityView]:
         """
-        Return a list of "Other Resource" rdflib Graphs, where each graph is for a
+        Return a list of "Other Resource" subgraphs, where each graph is for a
         distinct resource.
+
+        The subgraphs from these methods are EntityViews onto self.graph rather
+        than rdflib Graphs of their own; use to_graph() on one for a real Graph.
         """
-        return self._subgraphs("others", self._extract_others)
+        return self._subgraphs("others")
 
     def save(
         self,
@@ -311,22 +615,205 @@ class BluecoreGraph:
         max_attempts: int = SAVE_MAX_ATTEMPTS,
         primary_class=None,
         update_other_resources: bool = True,
-    ) -> None:
+        executor: Executor | None = None,
+        slow: SlowSave | None = None,
+        bulk: bool = False,
+    ) -> SaveReport:
         """
         Persists the graph to the database using the supplied sqlalchemy
         sessionmaker. All the database modifications are made using a single
-        transaction.
+        transaction. A SaveReport of what was done is returned, and kept as
+        self.report.
 
         Under concurrent writers a transaction can still lose a race and be
         aborted by Postgres with a deadlock or serialization failure. Since a
         graph save is self-contained and idempotent, we simply re-run the whole
         thing on a fresh session up to max_attempts times.
+
+        Framing the JSON-LD of each resource written is CPU bound, and for a
+        record with hundreds of resources it is most of a save. Pass an executor
+        to do it in parallel -- a ProcessPoolExecutor, since framing holds the
+        GIL. The caller owns the executor and can share it between saves. The
+        stored data, and the order resources are written in, are the same
+        either way.
+
+        Pass slow to log saves that take longer than a threshold, and optionally
+        keep their input and a profile of them; see SlowSave.
+
+        With bulk True each kind of resource is written with a single
+        INSERT ... ON CONFLICT (uri) statement, which inserts the new ones,
+        updates those whose data changed and leaves the rest, instead of an
+        INSERT or UPDATE per resource through the ORM; see _upsert_resources. A
+        concurrent save inserting the same Other Resource then waits for the
+        other to commit rather than failing on it and starting over.
+        """
+        save = partial(
+            self._save,
+            session_maker,
+            max_attempts,
+            primary_class,
+            update_other_resources,
+            executor,
+            bulk,
+        )
+        if slow is None:
+            return save()
+
+        # what's needed to look into a slow save has to be gathered from every
+        # save, since whether it will be slow isn't known until it's over. The
+        # graph is kept as it was passed in, before _infer added to it, so that
+        # a replay of it takes the same path.
+        triples = (
+            [triple for triple in self.graph if triple not in self._inferred]
+            if slow.directory is not None
+            else None
+        )
+        arguments: dict[str, Any] = {
+            "primary_class": _class_name(primary_class),
+            "update_other_resources": update_other_resources,
+        }
+        profiler = None
+        if slow.directory is not None and slow.profile:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # something else is profiling already, e.g. the benchmark
+                logger.debug("not profiling save: another profiler is active")
+                profiler = None
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            try:
+                report = save()
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        except Exception as error:
+            # a save that failed, maybe after running out of attempts, has no
+            # SaveReport: say what there is of one
+            wall = time.perf_counter() - start_wall
+            if wall > slow.seconds:
+                record: dict[str, Any] = {
+                    **arguments,
+                    "seconds": round(wall, 3),
+                    "threshold": slow.seconds,
+                    "cpu_seconds": round(time.process_time() - start_cpu, 3),
+                    "phases": {
+                        phase: {"wall": round(phase_wall, 3), "cpu": round(cpu, 3)}
+                        for phase, (phase_wall, cpu) in self._timings.items()
+                    },
+                    "attempts": len(self._retry_errors) + 1,
+                    "errors": list(self._retry_errors),
+                    "error": f"{type(error).__name__}: {error}",
+                }
+                self._log_slow_save(record, slow, triples, profiler)
+            raise
+
+        if report.wall > slow.seconds:
+            record = {
+                **arguments,
+                "seconds": round(report.wall, 3),
+                "threshold": slow.seconds,
+                "cpu_seconds": round(report.cpu, 3),
+                "triples": report.triples,
+                "phases": {
+                    phase: {"wall": round(timing.wall, 3), "cpu": round(timing.cpu, 3)}
+                    for phase, timing in report.phases.items()
+                },
+                "resources": report.resources,
+                "links": report.links,
+                "attempts": report.attempts,
+                "errors": report.errors,
+            }
+            self._log_slow_save(record, slow, triples, profiler)
+        return report
+
+    def _log_slow_save(
+        self,
+        record: dict[str, Any],
+        slow: SlowSave,
+        triples: list[Triple] | None,
+        profiler: cProfile.Profile | None,
+    ) -> None:
+        """
+        Log a save that took longer than slow.seconds, from a record of what
+        it did, and write out its input and profile if they were kept.
         """
+        record = {"source": self.source, **record}
+        if slow.directory is not None:
+            os.makedirs(slow.directory, exist_ok=True)
+            stem = os.path.join(
+                slow.directory,
+                f"slow-save-{datetime.datetime.now(datetime.UTC):%Y%m%dT%H%M%S}-"
+                f"{uuid4().hex[:8]}",
+            )
+            if triples is not None:
+                graph = Graph()
+                for triple in triples:
+                    graph.add(triple)
+                graph.serialize(f"{stem}.nt", format="nt", encoding="utf-8")
+                record["graph"] = f"{stem}.nt"
+            if profiler is not None:
+                profiler.dump_stats(f"{stem}.pstats")
+                record["profile"] = f"{stem}.pstats"
+
+        metrics.get_registry().counter(
+            "bluecore_slow_saves_total", "Graph saves slower than their threshold."
+        ).inc()
+        logger.warning(
+            f"slow graph save: {json.dumps(record)}", extra={"slow_save": record}
+        )
+
+    def _save(
+        self,
+        session_maker: sessionmaker,
+        max_attempts: int,
+        primary_class,
+        update_other_resources: bool,
+        executor: Executor | None,
+        bulk: bool,
+    ) -> SaveReport:
+        """The save itself, see save. A save that raises is counted as failed."""
+        try:
+            return self._run_save(
+                session_maker,
+                max_attempts,
+                primary_class,
+                update_other_resources,
+                executor,
+                bulk,
+            )
+        except Exception:
+            metrics.get_registry().counter(
+                "bluecore_saves_total", "Graph saves, by outcome.", ["outcome"]
+            ).inc(outcome="failed")
+            raise
+
+    def _run_save(
+        self,
+        session_maker: sessionmaker,
+        max_attempts: int,
+        primary_class,
+        update_other_resources: bool,
+        executor: Executor | None,
+        bulk: bool,
+    ) -> SaveReport:
+        """Run the save, see save."""
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        self._timings = {}
+        self._retry_errors = []
 
         def log_retry(retry_state) -> None:
             error = retry_state.outcome.exception()
+            name = type(getattr(error, "orig", error)).__name__
+            self._retry_errors.append(name)
+            metrics.get_registry().counter(
+                "bluecore_save_retries_total",
+                "Graph save attempts retried, by the error they failed with.",
+                ["error"],
+            ).inc(error=name)
             logger.warning(
-                f"retrying graph save after {type(error.orig).__name__} "
+                f"retrying graph save after {name} "
                 f"(attempt {retry_state.attempt_number} of {max_attempts})"
             )
 
@@ -338,6 +825,18 @@ class BluecoreGraph:
         def is_primary(kind) -> bool:
             return primary_class is None or primary_class == kind
 
+        # Other Resources have no catchall URI (class_ is None) and are the
+        # OtherResource kind for the primary check. On the bulk path
+        # (primary_class None), update_other_resources can opt out of
+        # re-describing already-present ones.
+        primary = {
+            BF.Hub: is_primary(BF.Hub),
+            BF.Work: is_primary(BF.Work),
+            BF.Instance: is_primary(BF.Instance),
+            None: primary_class == OtherResource
+            or (primary_class is None and update_other_resources),
+        }
+
         # A record describes a few resources and carries only a stub of the ones
         # it points at, giving the described ones adminMetadata and the stubs none. Note
         # them now: minting later generates adminMetadata of our own for every
@@ -353,13 +852,17 @@ class BluecoreGraph:
         }
         self._spot_stubs = primary_class is None and bool(self._described)
         self._ingest = primary_class is None
+        self._executor = executor
+        self._bulk = bulk
+        self._stamp_admin_metadata()
 
         # Reject blank node values the payload itself duplicated, before anything
         # here has had a chance to alter the graph. A caller is answerable for what
         # it sent us, not for what our own normalisation went on to do with it -- if
         # a later step leaves two blank nodes identical, that is ours to fix rather
         # than grounds for turning the payload away.
-        self._check_duplicate_values()
+        with self._timed("check_duplicates"):
+            self._check_duplicate_values()
 
         # An explicit write from the API is a real description, so it isn't a
         # stub any more.
@@ -371,66 +874,284 @@ class BluecoreGraph:
         # are then already clean, so _persist_resources can serialize the shared
         # (cached) subgraph directly rather than copying each one just to strip
         # these out. Idempotent, so re-running under a retry is a no-op.
-        self._strip_excluded_triples()
+        with self._timed("strip"):
+            self._strip_excluded_triples()
+
+        # Minting, partitioning, framing and working out the links all depend on
+        # the graph alone, bar the lookup of resources by their derivedFrom URI
+        # while minting, so the first attempt plans them (in its transaction, for
+        # that lookup) and every attempt applies the plan. A retry after a
+        # deadlock then only runs the SQL again -- and the graph, which planning
+        # changed, isn't minted over a second time. The exception is losing the
+        # race to claim a source to another save (see _claim_sources): the
+        # resources it minted are adopted and the plan made again.
+        plan: SavePlan | None = None
+        # The statements run, if there is a StatementProfiler to see them.
+        with statement_stats() as statements:
+            try:
+                for attempt in Retrying(
+                    retry=retry_if_exception(_is_retryable_pg_error)
+                    | retry_if_exception_type(SourceConflictError),
+                    stop=stop_after_attempt(max_attempts),
+                    before_sleep=log_retry,
+                    reraise=True,
+                ):
+                    with attempt, session_maker() as session:
+                        if plan is None:
+                            plan = self._plan(session, primary)
+                        try:
+                            self._apply(plan, session)
+                        except SourceConflictError as conflict:
+                            self._switch_uris(conflict.owners, add_derived_from=False)
+                            plan = None
+                            raise
+            except (OperationalError, IntegrityError, SourceConflictError) as error:
+                if _is_retryable_pg_error(error) or isinstance(
+                    error, SourceConflictError
+                ):
+                    logger.error(f"Exceeded {max_attempts} attempts with error {error}")
+                raise
+
+        self.report = SaveReport(
+            triples=len(self.graph),
+            wall=time.perf_counter() - start_wall,
+            cpu=time.process_time() - start_cpu,
+            phases={
+                phase: PhaseTime(wall, cpu)
+                for phase, (wall, cpu) in self._timings.items()
+            },
+            inserted=self._count("inserted"),
+            updated=self._count("updated"),
+            unchanged=self._count("unchanged"),
+            kept=self._count("kept"),
+            links=self._links,
+            resources={
+                kind: {
+                    outcome: n
+                    for (table, outcome), n in self._counts.items()
+                    if table == kind
+                }
+                for kind, _ in self._counts
+            },
+            attempts=len(self._retry_errors) + 1,
+            errors=list(self._retry_errors),
+            statements=statements,
+        )
+        _record_metrics(self.report)
+        return self.report
+
+    def _count(self, outcome: str) -> int:
+        return sum(n for (_, done), n in self._counts.items() if done == outcome)
 
+    @contextmanager
+    def _timed(self, phase: str) -> Iterator[None]:
+        """
+        Add the wall clock and CPU time the block takes to that of phase, for
+        the SaveReport, less the time of any phase timed inside it.
+        """
+        timing = self._timings.setdefault(phase, [0.0, 0.0])
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        inner = [0.0, 0.0]
+        self._running.append(inner)
         try:
-            for attempt in Retrying(
-                retry=retry_if_exception(_is_retryable_pg_error),
-                stop=stop_after_attempt(max_attempts),
-                before_sleep=log_retry,
-                reraise=True,
+            yield
+        finally:
+            self._running.pop()
+            wall = time.perf_counter() - start_wall
+            cpu = time.process_time() - start_cpu
+            timing[0] += wall - inner[0]
+            timing[1] += cpu - inner[1]
+            if self._running:
+                self._running[-1][0] += wall
+                self._running[-1][1] += cpu
+
+    def _plan(self, session: Session, primary: dict[URIRef | None, bool]) -> SavePlan:
+        """
+        Work out what save() writes. URIs in the graph are resolved to their
+        Bluecore equivalent or minted as appropriate (note: OtherResources keep
+        their original URI), which changes the graph, and the resources to write
+        and the links between them are taken from the result. session is only
+        read from. primary says which kinds are written authoritatively.
+        """
+        renames: dict[IdentifiedNode, URIRef] = {}
+        with self._timed("mint"):
+            derived = self._find_derived(session)
+            for class_ in (BF.Hub, BF.Work, BF.Instance):
+                renames.update(self._mint_all_uris(class_, derived))
+
+        with self._timed("plan"):
+            return self._plan_writes(renames, primary)
+
+    def _plan_writes(
+        self,
+        renames: dict[IdentifiedNode, URIRef],
+        primary: dict[URIRef | None, bool],
+    ) -> SavePlan:
+        """
+        The SavePlan for the minted graph: see _plan.
+        """
+
+        resources: list[
+            tuple[
+                URIRef | None,
+                type[ResourceBase],
+                bool,
+                list[tuple[IdentifiedNode, EntityView]],
+            ]
+        ] = []
+        for class_, sqla_class, graphs in (
+            (BF.Hub, Hub, self.hubs()),
+            (BF.Work, Work, self.works()),
+            (BF.Instance, Instance, self.instances()),
+            (None, OtherResource, self.others()),
+        ):
+            kind = [(self._subject(g, class_), g) for g in graphs]
+            # Write shared Other Resources in a deterministic, sorted-by-URI
+            # order. Concurrent transactions then acquire locks on these hot rows
+            # in the same order and serialize instead of deadlocking.
+            if class_ is None:
+                kind.sort(key=lambda resource: str(resource[0]))
+            resources.append((class_, sqla_class, primary[class_], kind))
+        _, (_, _, _, works), (_, _, _, instances), (_, _, _, others) = resources
+
+        # Sort all the link iterations by URI too, so that concurrent
+        # transactions acquire row locks in the same deterministic order. Use
+        # bibframe:instanceOf and then bibframe:hasInstance assertions to link
+        # Instances with Works.
+        #
+        # Maybe we should have a simple inference step early on that infers missing
+        # bibframe:instanceOf assertions, and possible other inverse properties
+        # that we might rely on?
+        instance_links = []
+        for predicate in (BF.instanceOf, BF.hasInstance):
+            for s, o in sorted(
+                self.graph.subject_objects(predicate),
+                key=lambda pair: (str(pair[0]), str(pair[1])),
             ):
-                with attempt, session_maker() as session:
-                    # start each attempt with a clean record of what was inserted
-                    self._created = set()
-
-                    # resolve URIs in the graph to their Bluecore equivalent or mint them as appropriate.
-                    # note: OtherResources keep their original URI
-                    self._mint_all_uris(BF.Hub, session)
-                    self._mint_all_uris(BF.Work, session)
-                    self._mint_all_uris(BF.Instance, session)
-
-                    self._persist_resources(BF.Hub, session, is_primary(BF.Hub))
-                    self._persist_resources(BF.Work, session, is_primary(BF.Work))
-                    self._persist_resources(
-                        BF.Instance, session, is_primary(BF.Instance)
-                    )
-                    # Other Resources have no catchall URI (class_ is None) and
-                    # are the OtherResource kind for the primary check. On the
-                    # bulk path (primary_class None), update_other_resources can
-                    # opt out of re-describing already-present ones.
-                    other_is_primary = primary_class == OtherResource or (
-                        primary_class is None and update_other_resources
+                # a mention has no record of its own to link
+                if s in self._relation_stubs or o in self._relation_stubs:
+                    continue
+                instance_links.append((s, o) if predicate == BF.instanceOf else (o, s))
+
+        bibframe_resources: list[tuple[URIRef, type, IdentifiedNode]] = [
+            (BF.Work, Work, uri) for uri, _ in works
+        ] + [(BF.Instance, Instance, uri) for uri, _ in instances]
+
+        # index the Works and Instances by the objects in their graphs, so that
+        # finding the ones an Other Resource appears in is a lookup rather than
+        # a scan of every graph. Works come before Instances, each in uri order.
+        linked: dict[Node, list[tuple[URIRef, type, IdentifiedNode]]] = {}
+        for class_, sqla_class, graphs in (
+            (BF.Work, Work, works),
+            (BF.Instance, Instance, instances),
+        ):
+            for uri, g in sorted(graphs, key=lambda resource: str(resource[0])):
+                for o in dict.fromkeys(g.objects()):
+                    linked.setdefault(o, []).append((class_, sqla_class, uri))
+        other_links = [(uri, linked[uri]) for uri, _ in others if uri in linked]
+
+        return SavePlan(
+            renames=renames,
+            resources=resources,
+            instance_links=instance_links,
+            bibframe_resources=bibframe_resources,
+            other_links=other_links,
+            framed={},
+        )
+
+    def _apply(self, plan: SavePlan, session: Session) -> None:
+        """
+        Write what the plan says to the database in the given session, and commit
+        it. Nothing here changes the graph or the plan, other than framing
+        resources it hadn't needed to yet, so it can be run again on a fresh
+        session when the transaction has to be retried.
+        """
+        # start each attempt with a clean record of what was inserted
+        self._created = set()
+        self._counts = Counter()
+        self._links = 0
+
+        persist = self._upsert_resources if self._bulk else self._persist_resources
+        with self._timed("persist"):
+            for class_, sqla_class, is_primary, resources in plan.resources:
+                persist(class_, sqla_class, resources, session, is_primary, plan.framed)
+
+        # flush so the just-added resources have ids and are
+        # visible to _link's uri lookups. Required because the
+        # session may have autoflush disabled (as the
+        # bluecore_api session does), in which case _link's
+        # queries would otherwise not see them and would build
+        # link rows with null foreign keys.
+        with self._timed("flush"):
+            session.flush()
+
+        with self._timed("claim"):
+            self._claim_sources(plan, session)
+
+        # link all the works, instances and other resources together in the db.
+        # _link issues many per-uri lookups; with autoflush on, each one
+        # re-flushes the pending link changes (and re-fires update events /
+        # bf-class recomputation). The resources it reads were already
+        # flushed above, so turn autoflush off for the link phase and let
+        # commit() do the single final flush. (bluecore_api's session already
+        # runs with autoflush disabled.)
+        prev_autoflush = session.autoflush
+        session.autoflush = False
+        try:
+            with self._timed("link"):
+                self._link(plan, session)
+        finally:
+            session.autoflush = prev_autoflush
+
+        # all changes are part of one transaction!
+        with self._timed("commit"):
+            session.commit()
+
+    def _claim_sources(self, plan: SavePlan, session: Session) -> None:
+        """
+        Check that the sources of the resources minted and inserted by this
+        attempt are theirs in resource_sources. Inserting the resources claimed
+        them (see utils.db.add_sources), waiting on any other save that had
+        claimed one first; if that save committed, the source is its resource's,
+        and SourceConflictError says which resource that is.
+        """
+        kinds = {
+            str(uri): sqla_class.__tablename__
+            for class_, sqla_class, _, resources in plan.resources
+            if class_ is not None
+            for uri, _ in resources
+        }
+        minted = {
+            uri: (kinds[uri], self._minted_from[uri])
+            for uri in self._created
+            if uri in kinds and uri in self._minted_from
+        }
+        if not minted:
+            return
+
+        rows = session.execute(
+            select(ResourceSource.type, ResourceSource.source_uri, ResourceBase.uri)
+            .join(ResourceBase, ResourceBase.id == ResourceSource.resource_id)
+            .where(
+                ResourceSource.type.in_({type_ for type_, _ in minted.values()}),
+                ResourceSource.source_uri
+                == any_(
+                    bindparam(
+                        "sources",
+                        sorted({source for _, source in minted.values()}),
+                        type_=ARRAY(Text),
                     )
-                    self._persist_resources(None, session, other_is_primary)
-
-                    # flush so the just-added resources have ids and are
-                    # visible to _link's uri lookups. Required because the
-                    # session may have autoflush disabled (as the
-                    # bluecore_api session does), in which case _link's
-                    # queries would otherwise not see them and would build
-                    # link rows with null foreign keys.
-                    session.flush()
-
-                    # link all the works, instances and other resources together in the db.
-                    # _link issues many per-uri lookups; with autoflush on, each one
-                    # re-flushes the pending link changes (and re-fires update events /
-                    # bf-class recomputation). The resources it reads were already
-                    # flushed above, so turn autoflush off for the link phase and let
-                    # commit() do the single final flush. (bluecore_api's session already
-                    # runs with autoflush disabled.)
-                    prev_autoflush = session.autoflush
-                    session.autoflush = False
-                    try:
-                        self._link(session)
-                    finally:
-                        session.autoflush = prev_autoflush
-
-                    # all changes are part of one transaction!
-                    session.commit()
-        except (OperationalError, IntegrityError) as error:
-            logger.error(f"Exceeded {max_attempts} attempts with error {error}")
-            raise
+                ),
+            )
+        )
+        owners = {(type_, source): uri for type_, source, uri in rows}
+        conflicts: dict[IdentifiedNode, URIRef] = {
+            URIRef(uri): URIRef(owners[claim])
+            for uri, claim in sorted(minted.items())
+            if owners.get(claim, uri) != uri
+        }
+        if conflicts:
+            raise SourceConflictError(conflicts)
 
     def _infer(self) -> None:
         """
@@ -442,13 +1163,19 @@ class BluecoreGraph:
         inverse_properties = [
             (BF.hasInstance, BF.instanceOf),
         ]
+
+        def add(triple: Triple) -> None:
+            if triple not in self.graph:
+                self.graph.add(triple)
+                self._inferred.add(triple)
+
         for pred1, pred2 in inverse_properties:
             # add inverse of pred1
-            for s, o in self.graph.subject_objects(predicate=pred1):
-                self.graph.add((o, pred2, s))
+            for s, o in list(self.graph.subject_objects(predicate=pred1)):
+                add((o, pred2, s))
             # add inverse of pred2
-            for s, o in self.graph.subject_objects(predicate=pred2):
-                self.graph.add((o, pred1, s))
+            for s, o in list(self.graph.subject_objects(predicate=pred2)):
+                add((o, pred1, s))
 
         # now infer some resource types
         type_rules = [
@@ -460,114 +1187,161 @@ class BluecoreGraph:
         # turns a passing mention into a record. Anything else untyped and
         # nested is a new resource being written, so it still gets one.
         for predicate, object_type in type_rules:
-            for o in self.graph.objects(predicate=predicate):
+            for o in list(self.graph.objects(predicate=predicate)):
                 if o not in self._relation_stubs:
-                    self.graph.add((o, RDF.type, object_type))
-
-    def _extract_subgraphs(self, bibframe_class: URIRef) -> list[Graph]:
-        """
-        Returns a list of subgraphs for subjects of a given type, leaving out the
-        ones that are only a mention of the other end of a relationship.
-        """
-        return [
-            generate_entity_graph(self.graph, s)
-            for s in self.graph.subjects(RDF.type, bibframe_class)
+                    add((o, RDF.type, object_type))
+
+    def _partition(
+        self, describe: Callable[[Node], list[Triple]] | None = None
+    ) -> EntityPartition:
+        """
+        Sort the graph into Hub, Work, Instance and Other Resource subgraphs with
+        a single pass over it.
+
+        The pass groups every statement by subject, and each entity's subgraph
+        (its own statements and those of the blank nodes it reaches, as in
+        generate_entity_graph) is then put together from those groups rather than
+        by looking the graph up again. The Other Resources are the described,
+        non-vocabulary uris the Hub, Work and Instance subgraphs refer to, picked
+        out while those subgraphs are being assembled.
+
+        Mentions of the other end of a relationship are left out (see
+        _find_relation_stubs), as are Hubs from the Works, since LC catalog data
+        types Hubs as both bf:Hub and bf:Work.
+
+        describe, when supplied, gives the triples of an entity in place of the
+        pass; _switch_uris uses it to carry over the subgraphs a rename left alone.
+        """
+        if describe is None:
+            statements = group_statements(self.graph)
+            # the pass has just seen every subject, so _subjects needn't look again
+            self._subject_index = (self._revision, set(statements))
+            describe = partial(entity_statements, statements)
+        subjects = self._subjects()
+
+        hubs = [
+            s
+            for s in self.graph.subjects(RDF.type, BF.Hub)
+            if s not in self._relation_stubs
+        ]
+        works = [
+            s
+            for s in self.graph.subjects(RDF.type, BF.Work)
+            if (s, RDF.type, BF.Hub) not in self.graph and s not in self._relation_stubs
+        ]
+        instances = [
+            s
+            for s in self.graph.subjects(RDF.type, BF.Instance)
             if s not in self._relation_stubs
         ]
 
-    def _extract_others(self) -> list[Graph]:
-        """
-        Returns a list of subgraphs for resources that are referenced but not fully
-        described in the Bluecore Graph.
-        """
-        others = []
-        other_uris = set()
-
-        for g in self.works() + self.instances() + self.hubs():
-            # iterate through each object in the graph
-            for o in g.objects():
+        described: dict[Node, list[Triple]] = {}
+        other_uris: list[Node] = []
+        seen_others: set[Node] = set()
+        for entity in works + instances + hubs:
+            if entity in described:
+                continue
+            triples = described[entity] = describe(entity)
+            for _, _, o in triples:
                 # skip the object if it:
                 # - is not a URI (a BNode or a Literal)
                 # - is a term from the Bibframe, MADS or RDF vocabularies
                 # - is a Work, Instance or Hub, each stored as its own record
+                # - isn't described in the graph
                 if (
                     not isinstance(o, URIRef)
+                    or o in seen_others
+                    or o not in subjects
                     or self._exclude_uri_from_other_resources(o)
                     or self._is_bibframe_resource(o, self.graph)
                 ):
                     continue
+                seen_others.add(o)
+                other_uris.append(o)
+
+        for o in other_uris:
+            described[o] = describe(o)
 
-                # otherwise return the object URI, and its graph
-                if o in self.graph.subjects() and o not in other_uris:
-                    others.append(generate_entity_graph(self.graph, o))
-                    other_uris.add(o)
+        def views(kind: URIRef | None, entities: list[Node]) -> list[EntityView]:
+            return [EntityView(self.graph, s, kind, described[s]) for s in entities]
 
-        return others
+        return EntityPartition(
+            hubs=views(BF.Hub, hubs),
+            works=views(BF.Work, works),
+            instances=views(BF.Instance, instances),
+            others=views(None, other_uris),
+        )
 
     def _generate_admin_metadata(
         self,
-        bluecore_uri: URIRef,
-        source_uri: URIRef,
+        sources: dict[URIRef, URIRef],
         status: URIRef = DEFAULT_STATUS,
         agent: URIRef = DEFAULT_AGENT,
         desc_auth: URIRef = DEFAULT_DESC_AUTH,
         desc_lang: URIRef = DEFAULT_DESC_LANG,
         desc_level: URIRef = DEFAULT_DESC_LEVEL,
-        stub: bool = False,
     ):
         """
-        Generates two bf:AdminMetadata blank nodes for incoming RDF resources that are
-        derived from existing RDF resources. stub records that we hold only a
-        placeholder description of this resource.
-        """
-
-        time_stamp = datetime.datetime.now(datetime.UTC)
-
-        # what we hold of a stub is incomplete, whatever the caller asked for
-        if stub:
-            status = STUB_STATUS
-            self._describe_stub_status()
-
-        self._remove_admin_metadata(self.graph, bluecore_uri)
-
-        # First bf:AdminMetadata
-        first_admin_metadata = BNode()
-        self.graph.add((bluecore_uri, BF.adminMetadata, first_admin_metadata))
-        self.graph.add((first_admin_metadata, RDF.type, BF.AdminMetadata))
-        self.graph.add((first_admin_metadata, BF.agent, agent))
-        self.graph.add(
-            (
-                first_admin_metadata,
-                BF.date,
-                Literal(time_stamp.isoformat(), datatype=XSD.dateTime),
+        Generates two bf:AdminMetadata blank nodes for each incoming RDF resource
+        (a key of sources) that is derived from an existing RDF resource (its
+        value), replacing whatever AdminMetadata it had. A resource that arrived
+        as a stub (see _arrived_as_stub) is given STUB_STATUS in place of status.
+
+        All of them are regenerated together, and they all get the date and
+        cataloger id of the save (see _stamp_admin_metadata).
+        """
+        self._remove_admin_metadata(self.graph, sources)
+
+        date_time = Literal(self._described_at.isoformat(), datatype=XSD.dateTime)
+        date = Literal(self._described_at.strftime("%Y-%m-%d"))
+        cataloger_id = Literal(self._cataloger_id)
+        described_stub = False
+
+        for bluecore_uri, source_uri in sources.items():
+            # what we hold of a stub is incomplete, whatever the caller asked for
+            resource_status = status
+            if self._arrived_as_stub(bluecore_uri):
+                resource_status = STUB_STATUS
+                described_stub = True
+
+            # First bf:AdminMetadata
+            first_admin_metadata = BNode()
+            self.graph.add((bluecore_uri, BF.adminMetadata, first_admin_metadata))
+            self.graph.add((first_admin_metadata, RDF.type, BF.AdminMetadata))
+            self.graph.add((first_admin_metadata, BF.agent, agent))
+            self.graph.add((first_admin_metadata, BF.date, date_time))
+            self.graph.add((first_admin_metadata, BF.derivedFrom, source_uri))
+            self.graph.add((first_admin_metadata, BF.status, resource_status))
+
+            # Second bf:AdminMetadata
+            second_admin_metadata = BNode()
+            self.graph.add((bluecore_uri, BF.adminMetadata, second_admin_metadata))
+            self.graph.add((second_admin_metadata, RDF.type, BF.AdminMetadata))
+            self.graph.add((second_admin_metadata, BFLC.catalogerId, cataloger_id))
+            self.graph.add(
+                (second_admin_metadata, BF.descriptionAuthentication, desc_auth)
             )
-        )
-        self.graph.add((first_admin_metadata, BF.derivedFrom, source_uri))
-        self.graph.add((first_admin_metadata, BF.status, status))
+            self.graph.add((second_admin_metadata, BF.date, date))
+            self.graph.add((second_admin_metadata, BF.descriptionLanguage, desc_lang))
+            self.graph.add((second_admin_metadata, BF.descriptionLevel, desc_level))
 
-        # Second bf:AdminMetadata
-        second_admin_metadata = BNode()
-        self.graph.add((bluecore_uri, BF.adminMetadata, second_admin_metadata))
-        self.graph.add((second_admin_metadata, RDF.type, BF.AdminMetadata))
+        if described_stub:
+            self._describe_stub_status()
 
-        try:
-            cataloger_id = CURRENT_USER_ID.get()
-        finally:
-            if not cataloger_id:
-                cataloger_id = "Unknown"
-        self.graph.add((second_admin_metadata, BFLC.catalogerId, Literal(cataloger_id)))
-        self.graph.add((second_admin_metadata, BF.descriptionAuthentication, desc_auth))
-        self.graph.add(
-            (second_admin_metadata, BF.date, Literal(time_stamp.strftime("%Y-%m-%d")))
-        )
-        self.graph.add((second_admin_metadata, BF.descriptionLanguage, desc_lang))
-        self.graph.add((second_admin_metadata, BF.descriptionLevel, desc_level))
+    def _stamp_admin_metadata(self) -> None:
+        """
+        Note when, and by whom, the resources about to be saved were described,
+        for the AdminMetadata _generate_admin_metadata writes. Everything one save
+        writes shares them, so they are looked up once rather than per resource.
+        """
+        self._described_at = datetime.datetime.now(datetime.UTC)
+        self._cataloger_id = CURRENT_USER_ID.get() or "Unknown"
 
     def _describe_stub_status(self) -> None:
         """
         Describe the status term we mark stubs with.
 
-        _extract_others only promotes a referenced uri to an Other Resource if it
+        _partition only promotes a referenced uri to an Other Resource if it
         also appears as a subject in the graph, so a bare reference would be
         invisible to linking and leave the UI nothing but a uri to display.
         Incoming LC records describe the vocabulary terms they use the same way.
@@ -584,16 +1358,26 @@ class BluecoreGraph:
             if isinstance(obj, BNode):
                 self._remove_bnode(graph, obj)
 
-    def _remove_admin_metadata(self, graph: Graph, subject: URIRef | None = None):
+    def _remove_admin_metadata(
+        self, graph: Graph, subjects: Iterable[Node] | None = None
+    ):
         """
-        Removes existing AdminMetadata nodes. If a subject is supplied only that
-        resource's AdminMetadata is removed; otherwise all AdminMetadata in the graph
-        is removed. Scoping to a subject matters when the graph holds more than one
+        Removes existing AdminMetadata nodes. If subjects are supplied only those
+        resources' AdminMetadata is removed; otherwise all AdminMetadata in the graph
+        is removed. Scoping to subjects matters when the graph holds more than one
         resource, so regenerating one resource's AdminMetadata doesn't wipe another's.
+        Each subject's AdminMetadata is looked up directly, so the cost follows
+        the number of subjects rather than the size of the graph.
         """
-        for s, admin_metadata in graph.subject_objects(predicate=BF.adminMetadata):
-            if subject is not None and s != subject:
-                continue
+        if subjects is None:
+            found = list(graph.subject_objects(predicate=BF.adminMetadata))
+        else:
+            found = [
+                (s, admin_metadata)
+                for s in subjects
+                for admin_metadata in graph.objects(s, BF.adminMetadata)
+            ]
+        for s, admin_metadata in found:
             if not isinstance(admin_metadata, BNode):
                 continue
             # remove all triples describing the AdminMetadata blank node (and any nested ones)
@@ -616,16 +1400,23 @@ class BluecoreGraph:
                 self._remove_bnode(graph, obj)
                 graph.remove((s, predicate, obj))
 
-    def _subject(self, graph: Graph, class_: Node | None = None) -> IdentifiedNode:
+    def _subject(
+        self, graph: Graph | EntityView, class_: Node | None = None
+    ) -> IdentifiedNode:
         """
         Gets the subject from the supplied graph using the RDF type class. The
         subject must be an IdentifiedNode: either a URIRef or a BNode. If
         class_ is None, try to guess at the subject by assuming there is only one
-        subject URIRef in the supplied graph.
+        subject URIRef in the supplied graph. An EntityView extracted as class_
+        already knows its subject, so it is simply asked.
 
         This method throws several exceptions because it is important for
         downstream processing that it behaves in a predictable way.
         """
+        if isinstance(graph, EntityView) and graph.kind == class_:
+            if not isinstance(graph.subject, IdentifiedNode):
+                raise TypeError(f"Found unexpected subject identifier: {graph.subject}")
+            return graph.subject
         if isinstance(class_, Node):
             uris = list(set(graph.subjects(RDF.type, class_)))
         elif class_ is None:
@@ -652,11 +1443,54 @@ class BluecoreGraph:
 
         return uris[0]
 
-    def _mint_all_uris(self, class_: URIRef, session: Session) -> None:
+    def _find_derived(self, session: Session) -> dict[tuple[str, str], URIRef]:
+        """
+        Look up the Hubs, Works and Instances already in the database under the
+        derivedFrom URI of one without a Bluecore URI in the graph, all in one
+        query: the Bluecore URI of each, by its type and derivedFrom URI.
+
+        The sources are looked up in resource_sources, which has a row for each
+        derivedFrom of each resource, matching every candidate with = ANY, and
+        joined to resource_base for just the URI of the resource.
+        """
+        sources = {
+            str(uri)
+            for subgraphs, class_ in (
+                (self.hubs(), BF.Hub),
+                (self.works(), BF.Work),
+                (self.instances(), BF.Instance),
+            )
+            for uri in (self._subject(sg, class_) for sg in subgraphs)
+            if not self._is_bluecore_uri(uri)
+        }
+        if not sources:
+            return {}
+
+        rows = session.execute(
+            select(ResourceSource.type, ResourceSource.source_uri, ResourceBase.uri)
+            .join(ResourceBase, ResourceBase.id == ResourceSource.resource_id)
+            .where(
+                ResourceSource.type.in_(
+                    [sqla_class.__tablename__ for sqla_class in (Hub, Work, Instance)]
+                ),
+                ResourceSource.source_uri
+                == any_(bindparam("sources", sorted(sources), type_=ARRAY(Text))),
+            )
+        )
+        return {(type_, source): URIRef(uri) for type_, source, uri in rows}
+
+    def _mint_all_uris(
+        self, class_: URIRef, derived: dict[tuple[str, str], URIRef]
+    ) -> dict[IdentifiedNode, URIRef]:
         """
         Examine Bibframe Works and Instances in the graph, and mint Bluecore URIs for
         them as needed. This method takes into account that a resource with a non-Bluecore
-        URI may already be in the database under in its derivedFrom URI.
+        URI may already be in the database under in its derivedFrom URI, which
+        derived has looked up (see _find_derived).
+
+        The graph is only changed once every resource of the class has been
+        resolved, when all the renames are applied together (see _switch_uris).
+        The renames are returned.
         """
         match class_:
             case BF.Hub:
@@ -671,6 +1505,7 @@ class BluecoreGraph:
             case _:
                 raise BluecoreGraphError(f"Can't mint URIs for class of type {class_}")
 
+        renames: dict[IdentifiedNode, URIRef] = {}
         for sg in subgraphs:
             uri = self._subject(sg, class_)
 
@@ -684,43 +1519,30 @@ class BluecoreGraph:
 
                 bluecore_uri = self._derived_from_subject(uri)
 
-                # if not found look up the URI in the database to see if it has been
-                # previously saved with an adminMetadata derivedFrom assertion
+                # if not found see if the URI has been previously saved to the
+                # database with an adminMetadata derivedFrom assertion
 
                 if bluecore_uri is None:
-                    resource = (
-                        session.query(sqla_class)
-                        .where(
-                            func.jsonb_path_query_first(
-                                sqla_class.data,
-                                '$.adminMetadata[*].derivedFrom."@id"',
-                            ).op("#>>")("{}")
-                            == str(uri)
-                        )
-                        .first()
-                    )
-                    if resource is not None:
-                        bluecore_uri = resource.uri
+                    bluecore_uri = derived.get((sqla_class.__tablename__, str(uri)))
 
                 # if we found an existing bluecore URI then we can update the graph to use it
 
                 if bluecore_uri is not None:
-                    self._switch_uris(
-                        derived_from=uri, bluecore_uri=URIRef(bluecore_uri)
-                    )
+                    renames[uri] = URIRef(bluecore_uri)
 
                 # otherwise we need to mint a new bluecore uri and update the graph
 
                 else:
-                    derived_from = uri
-                    bluecore_uri = self._mint_uri(class_)
-                    self._switch_uris(derived_from, bluecore_uri)
+                    renames[uri] = self._mint_uri(class_, uri)
+
+        self._switch_uris(renames)
+        return renames
 
-    def _mint_uri(self, class_: URIRef) -> URIRef:
+    def _mint_uri(self, class_: URIRef, source: Node | None = None) -> URIRef:
         """
-        Mints a Bluecore URI for the given class.
+        Mints a Bluecore URI for the given class, for the resource called source
+        in the graph, as minting says (see BluecoreGraph).
         """
-        uuid = uuid4()
         match class_:
             case BF.Hub:
                 type_of = "hubs"
@@ -733,6 +1555,12 @@ class BluecoreGraph:
                     f"Can't mint Bluecore URI for class of type {class_}"
                 )
 
+        if self.minting == "name" and isinstance(source, URIRef):
+            uuid = uuid5(NAMESPACE_URL, f"{self.namespace}{type_of}/{source}")
+        elif self.minting == "time":
+            uuid = uuid7()
+        else:
+            uuid = uuid4()
         return self.namespace[f"{type_of}/{uuid}"]
 
     def _derived_from_subject(self, source_uri: Node) -> URIRef | None:
@@ -752,21 +1580,100 @@ class BluecoreGraph:
                 return subject
         return None
 
-    def _switch_uris(self, derived_from: IdentifiedNode, bluecore_uri: URIRef) -> None:
+    def _switch_uris(
+        self, renames: dict[IdentifiedNode, URIRef], add_derived_from: bool = True
+    ) -> None:
         """
-        Updates the supplied graph so that assertions involving the
-        derived_from as the subject now use the bluecore_uri in its place.
-        A bibframe:derivedFrom assertion is added to record the relationship
-        if the derived_from is URIRef.
+        Updates the graph so that assertions involving each derived_from (a key
+        of renames) now use its bluecore_uri (the value) in its place, renaming
+        them all in one go. A bibframe:derivedFrom assertion is added to record
+        the relationship if the derived_from is URIRef, unless add_derived_from
+        is False: when a minted URI is swapped for another (see SourceConflictError)
+        the resource already records what it was derived from.
         """
-        self._bump_revision()  # replace_uri + _generate_admin_metadata mutate self.graph
-        self._minted_from[str(bluecore_uri)] = str(derived_from)
-        replace_uri(self.graph, derived_from, bluecore_uri)
+        if not renames:
+            return
+        # The subgraphs cached before the switch stay good for every entity that
+        # doesn't reach a subject whose statements the switch changes: the renamed
+        # ones, whatever points at them, and their adminMetadata. Note those
+        # before the graph changes and patch the cache afterwards.
+        cached = self._subgraph_cache.get("works")
+        subjects = None
+        if cached is not None and cached[0] == self._revision:
+            subjects = self._subjects()
+            changed = self._switched_subjects(renames)
+        self._bump_revision()  # replace_uris + _generate_admin_metadata mutate self.graph
+        for derived_from, bluecore_uri in renames.items():
+            # a minted URI swapped for another passes on what it was minted from
+            self._minted_from[str(bluecore_uri)] = self._minted_from.get(
+                str(derived_from), str(derived_from)
+            )
+        replace_uris(self.graph, renames)
         # only add derivedFrom assertions for URIs
-        if isinstance(derived_from, URIRef):
+        if add_derived_from:
             self._generate_admin_metadata(
-                bluecore_uri, derived_from, stub=self._arrived_as_stub(bluecore_uri)
+                {
+                    bluecore_uri: derived_from
+                    for derived_from, bluecore_uri in renames.items()
+                    if isinstance(derived_from, URIRef)
+                }
             )
+        if subjects is not None:
+            changed |= self._switched_subjects(renames)
+            changed.add(STUB_STATUS)
+            self._patch_subgraphs(changed, subjects)
+
+    def _switched_subjects(self, renames: dict[IdentifiedNode, URIRef]) -> set[Node]:
+        """
+        The subjects whose statements _switch_uris may change: both names of each
+        renamed resource, the subjects that refer to either, and the blank nodes
+        of their adminMetadata. Called before and after the switch, so between
+        them they cover the statements removed and those added.
+        """
+        changed: set[Node] = set()
+        for uri in itertools.chain(renames, renames.values()):
+            changed.add(uri)
+            changed.update(self.graph.subjects(None, uri))
+            queue = list(self.graph.objects(uri, BF.adminMetadata))
+            while queue:
+                node = queue.pop()
+                if isinstance(node, BNode) and node not in changed:
+                    changed.add(node)
+                    queue.extend(self.graph.objects(node))
+        return changed
+
+    def _patch_subgraphs(self, changed: set[Node], subjects: set[Node]) -> None:
+        """
+        Bring the subgraph cache and the subject index (subjects, as it stood
+        before the switch) up to date after a switch of uris changed the
+        statements of the changed subjects, without another pass over the whole
+        graph. A cached subgraph that reaches none of them is carried over as it
+        is; the rest are looked up afresh. Which entities there are is worked out
+        again as _partition always does, so they are the same ones partitioning
+        from scratch would find (the Other Resources may come in another order).
+        """
+        for subject in changed:
+            if (subject, None, None) in self.graph:
+                subjects.add(subject)
+            else:
+                subjects.discard(subject)
+        self._subject_index = (self._revision, subjects)
+
+        kept: dict[Node, list[Triple]] = {}
+        for _, views in self._subgraph_cache.values():
+            for view in views:
+                if not any(s in changed for s, _, _ in view.triples):
+                    kept[view.subject] = list(view.triples)
+
+        def describe(entity: Node) -> list[Triple]:
+            triples = kept.get(entity)
+            if triples is None:
+                triples = describe_entity(self.graph, entity)
+            return triples
+
+        partition = self._partition(describe)
+        for kind, graphs in partition._asdict().items():
+            self._subgraph_cache[kind] = (self._revision, graphs)
 
     def _exclude_uri_from_other_resources(self, uri: Node) -> bool:
         """Checks if uri is in the BF, MADS, or RDF namespaces"""
@@ -832,7 +1739,7 @@ class BluecoreGraph:
         """Other Resources never carry adminMetadata, so they are left out."""
         return class_ is not None and self._arrived_as_stub(uri)
 
-    def _keep_existing(self, class_: URIRef | None, uri: Node, obj) -> bool:
+    def _keep_existing(self, class_: URIRef | None, uri: Node, stored) -> bool:
         """
         Leave a resource alone when an outside record comes round again for
         something we already describe in full, since it has nothing to add and
@@ -844,11 +1751,11 @@ class BluecoreGraph:
         if str(uri) not in self._minted_from:
             return False
         # a stub is only a placeholder, so a real description always replaces it
-        return not self._stored_is_stub(obj)
+        return not self._stored_is_stub(stored)
 
-    def _stored_is_stub(self, obj) -> bool:
-        """Whether what we hold is still a placeholder rather than a description."""
-        admin_metadata = obj.data.get("adminMetadata", []) if obj.data else []
+    def _stored_is_stub(self, stored) -> bool:
+        """Whether the data we hold is still a placeholder rather than a description."""
+        admin_metadata = stored.get("adminMetadata", []) if stored else []
         if isinstance(admin_metadata, dict):
             admin_metadata = [admin_metadata]
         for block in admin_metadata:
@@ -860,13 +1767,12 @@ class BluecoreGraph:
                     return True
         return False
 
-    def _keeps_own_links(self, class_: URIRef, graph: Graph) -> bool:
+    def _keeps_own_links(self, class_: URIRef, uri: Node) -> bool:
         """
         Whether this resource's existing links should be left alone: it is one we
         only have a stub of, and it was already here to have links in the first
         place. A stub we just created has none, so it links like anything else.
         """
-        uri = self._subject(graph, class_)
         return self._is_stub(class_, uri) and str(uri) not in self._created
 
     def _check_duplicate_values(self) -> None:
@@ -897,11 +1803,18 @@ class BluecoreGraph:
         raise DuplicateValueError(where + "; ".join(described))
 
     def _persist_resources(
-        self, class_: URIRef | None, session: Session, is_primary: bool = True
+        self,
+        class_: URIRef | None,
+        sqla_class,
+        resources: list[tuple[IdentifiedNode, EntityView]],
+        session: Session,
+        is_primary: bool,
+        framed: dict[str, FramedJsonLD],
     ) -> None:
         """
-        Persist resources of the supplied type to the given database session. If
-        the type is None then Other Resources are saved.
+        Persist the (uri, subgraph) resources of the supplied type, in the order
+        given, to the given database session. If the type is None they are Other
+        Resources.
 
         When is_primary is True these resources are authoritatively upserted;
         otherwise they are references, which we create if absent but never
@@ -909,45 +1822,31 @@ class BluecoreGraph:
         clobber an existing full description. (save() sets is_primary per kind
         from its primary_class argument; None there means every kind is primary,
         the original behavior.)
-        """
-        match class_:
-            case BF.Hub:
-                resources = self.hubs()
-                sqla_class = Hub
-            case BF.Work:
-                resources = self.works()
-                sqla_class = Work
-            case BF.Instance:
-                resources = self.instances()
-                sqla_class = Instance
-            case None:
-                resources = self.others()
-                sqla_class = OtherResource
-
-        # Write Works, Instances, and shared Other Resources in a deterministic,
-        # sorted-by-URI order. Concurrent transactions then acquire locks on
-        # these hot rows in the same order and serialize instead of deadlocking.
-        if class_ is None:
-            resources = sorted(resources, key=lambda g: str(self._subject(g, class_)))
 
+        framed holds the JSON-LD of resources already framed, by uri; what is
+        framed here is added to it, so a retried save doesn't frame it again.
+        """
         # Fetch the resources of this batch that already exist in a single query,
         # keyed by uri, rather than a SELECT per resource -- so re-saves and large
         # batches don't fan out into a round-trip each.
-        subjects = [self._subject(g, class_) for g in resources]
         existing = {
             obj.uri: obj
             for obj in session.query(sqla_class).where(
-                sqla_class.uri.in_([str(uri) for uri in subjects])
+                sqla_class.uri.in_([str(uri) for uri, _ in resources])
             )
         }
 
-        for g, uri in zip(resources, subjects):
+        # Work out everything to write before writing any of it, so the framing
+        # can be done all at once (see _frame_all) and the writes still made in
+        # the order given.
+        writes = []
+        for uri, g in resources:
             obj = existing.get(str(uri))
 
             if obj is not None and (
                 not is_primary
                 or self._is_stub(class_, uri)
-                or self._keep_existing(class_, uri, obj)
+                or self._keep_existing(class_, uri, obj.data)
             ):
                 # a reference to an existing resource: link it (later, in _link)
                 # but never overwrite its stored description. Skip before building
@@ -955,17 +1854,25 @@ class BluecoreGraph:
                 # (this is the hot path when batch-loading records that share many
                 # Other Resources).
                 logger.debug(f"keeping existing {uri} (referenced, not primary)")
+                self._counts[sqla_class.__tablename__, "kept"] += 1
                 continue
+            writes.append((g, uri, obj))
 
-            # Serialize the shared (cached) subgraph directly. save() already
-            # stripped EXCLUDED_TRIPLE_TYPES from self.graph up front (see
-            # _strip_excluded_triples), so there's nothing to remove here and no
-            # need to copy the subgraph to protect it from an in-place mutation.
-            data = json.loads(g.serialize(format="json-ld"))
+        unframed = [(uri, g) for g, uri, _ in writes if str(uri) not in framed]
+        with self._timed("frame"):
+            framed.update(
+                zip((str(uri) for uri, _ in unframed), self._frame_all(unframed))
+            )
 
+        for g, uri, obj in writes:
+            data = framed[str(uri)]
             if obj:
                 obj.data = data
                 logger.info(f"updating {uri}")
+                self._counts[
+                    sqla_class.__tablename__,
+                    "updated" if session.is_modified(obj) else "unchanged",
+                ] += 1
                 # Sqlalchemy ORM already does a comparison between the retrieved object
                 # and new object and will only do an UPDATE if they are different
                 session.add(obj)
@@ -983,167 +1890,286 @@ class BluecoreGraph:
                 logger.info(f"inserting {uri}")
                 session.add(obj)
                 self._created.add(str(uri))
+                self._counts[sqla_class.__tablename__, "inserted"] += 1
 
-    def _link(self, session) -> None:
-        """
-        Save relations between Instances, Works and Other Resources in the graph.
+    def _upsert_resources(
+        self,
+        class_: URIRef | None,
+        sqla_class,
+        resources: list[tuple[IdentifiedNode, EntityView]],
+        session: Session,
+        is_primary: bool,
+        framed: dict[str, FramedJsonLD],
+    ) -> None:
         """
+        What _persist_resources does, with SQL rather than the ORM: the resources
+        are written to resource_base with one INSERT ... ON CONFLICT (uri), which
+        updates those that are primary if their data has changed and leaves the
+        rest as they are, and the ones it inserted are added to the kind's own
+        table in one more. The Versions, Bibframe classes and sources that the
+        models' event hooks would record are recorded here.
+        """
+        tablename = sqla_class.__tablename__
+        # which resources are here already, as in _persist_resources, with their
+        # data if it could be needed to decide whether to keep them
+        columns = [sqla_class.uri, sqla_class.id]
+        if class_ is not None and self._ingest:
+            columns.append(sqla_class.data)
+        existing = {
+            row.uri: row
+            for row in session.execute(
+                select(*columns).where(
+                    sqla_class.uri.in_([str(uri) for uri, _ in resources])
+                )
+            )
+        }
 
-        # Cache resource lookups for the duration of this link operation. _link
-        # resolves the same Works, Instances and Other Resources repeatedly (a
-        # Work is re-queried for every Other Resource it links to, etc.); caching
-        # by (type, uri) turns those repeats into a single query each. Every
-        # resource was flushed by save() before _link runs, so the first lookup
-        # already sees it.
-        cache: dict[tuple, object] = {}
-
-        # use bibframe:instanceOf assertions to link instances with works
-        #
-        # Maybe we should have a simple inference step early on that infers missing
-        # bibframe:instanceOf assertions, and possible other inverse properties
-        # that we might rely on?
+        writes = []
+        for uri, g in resources:
+            row = existing.get(str(uri))
+            if row is not None and (
+                not is_primary
+                or self._is_stub(class_, uri)
+                or self._keep_existing(class_, uri, getattr(row, "data", None))
+            ):
+                logger.debug(f"keeping existing {uri} (referenced, not primary)")
+                self._counts[tablename, "kept"] += 1
+                continue
+            writes.append((uri, g))
+        if not writes:
+            return
 
-        # sort all the link iterations by URI so that, like _persist_resources, concurrent
-        # transactions acquire row locks in the same deterministic order.
+        unframed = [(uri, g) for uri, g in writes if str(uri) not in framed]
+        with self._timed("frame"):
+            framed.update(
+                zip((str(uri) for uri, _ in unframed), self._frame_all(unframed))
+            )
 
-        for s, o in sorted(
-            self.graph.subject_objects(BF.instanceOf),
-            key=lambda pair: (str(pair[0]), str(pair[1])),
-        ):
-            # a mention has no record of its own to link
-            if s in self._relation_stubs or o in self._relation_stubs:
-                continue
-            logger.info(f"linking {s} to {o}")
-            instance = self._get_first(session, Instance, s, cache)
-            work = self._get_first(session, Work, o, cache)
-            instance.work = work
-            session.add(instance)
-
-        # use bibframe:hasInstance to link works with instances
-        for s, o in sorted(
-            self.graph.subject_objects(BF.hasInstance),
-            key=lambda pair: (str(pair[0]), str(pair[1])),
+        now = datetime.datetime.now(datetime.UTC)
+        data = {}
+        rows = []
+        for uri, _ in writes:
+            doc = dict(framed[str(uri)])
+            doc.pop("@context", None)
+            data[str(uri)] = doc
+            rows.append(
+                {
+                    "type": tablename,
+                    "uri": str(uri),
+                    "uuid": None
+                    if sqla_class == OtherResource
+                    else UUID(str(uri).split("/")[-1]),
+                    "data": doc,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+        table = ResourceBase.__table__
+        stmt = pg_insert(table).values(rows)
+        if is_primary:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.uri],
+                set_={
+                    "data": stmt.excluded.data,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+                where=(table.c.type == stmt.excluded.type)
+                & table.c.data.is_distinct_from(stmt.excluded.data),
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[table.c.uri])
+        # xmax is 0 for a row this statement inserted rather than updated
+        written = session.execute(
+            stmt.returning(
+                table.c.id, table.c.uri, literal_column("xmax = 0").label("inserted")
+            )
+        ).all()
+
+        inserted = [row for row in written if row.inserted]
+        updated = [row for row in written if not row.inserted]
+        if inserted:
+            session.execute(
+                pg_insert(sqla_class.__table__).values(
+                    [{"id": row.id} for row in inserted]
+                )
+            )
+        for row in inserted:
+            logger.info(f"inserting {row.uri}")
+            self._created.add(row.uri)
+        for row in updated:
+            logger.info(f"updating {row.uri}")
+        # a resource that was neither inserted nor updated was unchanged, or
+        # inserted by another save since we looked
+        untouched = len(writes) - len(written)
+        for outcome, n in (
+            ("inserted", len(inserted)),
+            ("updated", len(updated)),
+            ("unchanged" if is_primary else "kept", untouched),
         ):
-            # a mention has no record of its own to link
-            if s in self._relation_stubs or o in self._relation_stubs:
-                continue
-            logger.info(f"linking {s} to {o}")
-            work = self._get_first(session, Work, s, cache)
-            instance = self._get_first(session, Instance, o, cache)
-            instance.work = work
-            session.add(instance)
+            if n:
+                self._counts[tablename, outcome] += n
+        if untouched:
+            metrics.get_registry().counter(
+                "bluecore_versions_total",
+                "Resources flushed, by table and whether a Version was written or the "
+                "resource was unchanged.",
+                ["kind", "outcome"],
+            ).inc(untouched, kind=tablename, outcome="unchanged")
+
+        connection = session.connection()
+        stored = [StoredResource(row.id, row.uri, data[row.uri]) for row in written]
+        add_versions(connection, tablename, stored, now)
+        if class_ is None:
+            return
+        for resource, new in zip(stored, (row.inserted for row in written)):
+            if new:
+                add_bf_classes(connection, resource)
+                insert_sources(connection, tablename, resource)
+            else:
+                update_bf_classes(connection, resource)
+                replace_sources(connection, tablename, resource)
+
+    def _frame_all(
+        self, resources: list[tuple[IdentifiedNode, EntityView]]
+    ) -> list[FramedJsonLD]:
+        """
+        The framed JSON-LD for each (uri, subgraph) pair, in the order given.
+
+        Each shared (cached) subgraph is framed directly. save() already stripped
+        EXCLUDED_TRIPLE_TYPES from self.graph up front (see
+        _strip_excluded_triples), so there's nothing to remove here and no need
+        to copy the subgraph to protect it from an in-place mutation. frame_graph
+        gives what serializing it and framing that with pyld would, which the
+        data setter then stores without framing again.
+
+        With an executor each subgraph is sent as its triples rather than as the
+        view, which would take the whole graph along with it.
+        """
+        if self._executor is None or len(resources) < 2:
+            return [frame_graph(str(uri), g) for uri, g in resources]
+        return list(
+            self._executor.map(
+                frame_triples,
+                [str(uri) for uri, _ in resources],
+                [tuple(g) for _, g in resources],
+                chunksize=FRAME_CHUNKSIZE,
+            )
+        )
+
+    def _link(self, plan: SavePlan, session: Session) -> None:
+        """
+        Save the relations the plan has between Instances, Works and Other
+        Resources.
+
+        Only what has changed is written: the links to Other Resources the
+        described Works and Instances should have are compared with the ones
+        they have, and just the missing ones are inserted and the stale ones
+        deleted, so saving an unchanged record again writes nothing. Each of
+        these is one statement, as is pointing the Instances at their Works.
+        """
+        ids = self._resource_ids(plan, session)
+
+        # an Instance linked to more than one Work ends up with the last, as it
+        # would assigning them in turn
+        work_ids: dict[int, int] = {}
+        for instance_uri, work_uri in plan.instance_links:
+            logger.info(f"linking {instance_uri} to {work_uri}")
+            instance_id = self._resource_id(ids, Instance, instance_uri)
+            work_ids[instance_id] = self._resource_id(ids, Work, work_uri)
+            self._links += 1
+        if work_ids:
+            links = values(
+                column("id", Integer), column("work_id", Integer), name="links"
+            ).data(list(work_ids.items()))
+            instances = Instance.__table__
+            session.execute(
+                update(instances)
+                .where(
+                    instances.c.id == links.c.id,
+                    instances.c.work_id.is_distinct_from(links.c.work_id),
+                )
+                .values(work_id=links.c.work_id)
+            )
 
         # link Works and Instances to their Other Resources, which is a bit more
         # complex since a Work or Instance has a many to many relationship with
-        # Other Resources
-
-        # first remove any existing Other Resource linkages between Works and
-        # Instances so that they can be replaced with the new ones
-        self._delete_other_links(BF.Work, session, cache)
-        self._delete_other_links(BF.Instance, session, cache)
-
-        # Only rebuild links for resources this record describes; a stub would
-        # otherwise drop that resource's links to its subjects and agents.
-        work_graphs = [
-            g
-            for g in sorted(self.works(), key=lambda g: str(self._subject(g, BF.Work)))
-            if not self._keeps_own_links(BF.Work, g)
-        ]
-        instance_graphs = [
-            g
-            for g in sorted(
-                self.instances(), key=lambda g: str(self._subject(g, BF.Instance))
-            )
-            if not self._keeps_own_links(BF.Instance, g)
+        # Other Resources. Only the links of resources this record describes are
+        # replaced; a stub would otherwise drop that resource's links to its
+        # subjects and agents.
+        described = [
+            self._resource_id(ids, sqla_class, uri)
+            for class_, sqla_class, uri in plan.bibframe_resources
+            if not self._keeps_own_links(class_, uri)
         ]
+        wanted: dict[tuple[int, int], str] = {}
+        for other_uri, bibframe_resources in plan.other_links:
+            other_id = self._resource_id(ids, OtherResource, other_uri)
+            for class_, sqla_class, uri in bibframe_resources:
+                if self._keeps_own_links(class_, uri):
+                    continue
+                bibframe_id = self._resource_id(ids, sqla_class, uri)
+                wanted[bibframe_id, other_id] = f"linking {uri} to {other_uri}"
+                self._links += 1
+        if not described:
+            return
 
-        for other_graph in sorted(self.others(), key=lambda g: str(self._subject(g))):
-            other_uri = self._subject(other_graph)
-
-            # look at each Work graph and see if the Other Resource URI appears
-            # as an object within it. If it does create a link between the Work and
-            # the Other Resource.
-            for g in work_graphs:
-                if other_uri in g.objects():
-                    work_uri = self._subject(g, BF.Work)
-                    logger.info(f"linking {work_uri} to {other_uri}")
-                    work_model = self._resolve(session, Work, work_uri, cache)
-                    other_model = self._resolve(
-                        session, OtherResource, other_uri, cache
-                    )
-                    session.add(
-                        BibframeOtherResources(
-                            bibframe_resource=work_model, other_resource=other_model
-                        )
-                    )
-
-            # do the same thing for each Instance graph
-            # TODO: maybe this very similar logic could be abstracted into a helper method
-            # but that might also further obscure what is going on?
-            for g in instance_graphs:
-                if other_uri in g.objects():
-                    instance_uri = self._subject(g, BF.Instance)
-                    logger.info(f"linking {instance_uri} to {other_uri}")
-                    instance_model = self._resolve(
-                        session, Instance, instance_uri, cache
-                    )
-                    other_model = self._resolve(
-                        session, OtherResource, other_uri, cache
-                    )
-                    session.add(
-                        BibframeOtherResources(
-                            bibframe_resource=instance_model, other_resource=other_model
-                        )
-                    )
-
-    def _delete_other_links(
-        self, class_: URIRef, session: Session, cache: dict
-    ) -> None:
-        """
-        Delete existing links to OtherResources so that they can be replaced
-        with new ones. Resources this record only stubs out keep the links they
-        have, since a stub isn't a description of them.
-        """
-        match class_:
-            case BF.Work:
-                graphs = self.works()
-                sqla_class = Work
-            case BF.Instance:
-                graphs = self.instances()
-                sqla_class = Instance
-
-        for g in graphs:
-            uri = self._subject(g, class_)
-            if self._keeps_own_links(class_, g):
-                continue
-            bf_resource = self._resolve(session, sqla_class, uri, cache)
-
-            session.query(BibframeOtherResources).filter(
-                BibframeOtherResources.bibframe_resource == bf_resource
-            ).delete()
+        table = BibframeOtherResources.__table__
+        stale = []
+        for link_id, bibframe_id, other_id in session.execute(
+            select(table.c.id, table.c.bibframe_resource_id, table.c.other_resource_id)
+            .where(
+                table.c.bibframe_resource_id
+                == any_(bindparam("described", described, type_=ARRAY(Integer)))
+            )
+            .order_by(table.c.id)
+        ):
+            # a link that is wanted and stored already is kept, once
+            if wanted.pop((bibframe_id, other_id), None) is None:
+                stale.append(link_id)
+        if stale:
+            session.execute(delete(table).where(table.c.id.in_(stale)))
+        if wanted:
+            for message in wanted.values():
+                logger.info(message)
+            session.execute(
+                insert(BibframeOtherResources),
+                [
+                    {"bibframe_resource_id": bibframe_id, "other_resource_id": other_id}
+                    for bibframe_id, other_id in wanted
+                ],
+            )
 
-    def _resolve(self, session: Session, sqla_class, uri: Node, cache: dict):
-        """
-        Look up a resource of the given type by uri, caching the result (keyed by
-        type + uri) so repeated lookups within a single _link operation only hit
-        the database once. Returns None if there is no matching resource.
-        """
-        key = (sqla_class, str(uri))
-        if key not in cache:
-            cache[key] = (
-                session.query(sqla_class).where(sqla_class.uri == str(uri)).first()
+    def _resource_ids(
+        self, plan: SavePlan, session: Session
+    ) -> dict[tuple[str, str], int]:
+        """
+        The ids of the resources the plan links, keyed by their table and uri,
+        looked up in one query. Every resource was flushed before _link runs, so
+        this sees them all.
+        """
+        uris = {str(instance) for instance, _ in plan.instance_links}
+        uris.update(str(work) for _, work in plan.instance_links)
+        uris.update(str(uri) for _, _, uri in plan.bibframe_resources)
+        uris.update(str(other) for other, _ in plan.other_links)
+        if not uris:
+            return {}
+        rows = session.execute(
+            select(ResourceBase.type, ResourceBase.uri, ResourceBase.id).where(
+                ResourceBase.uri
+                == any_(bindparam("uris", sorted(uris), type_=ARRAY(Text)))
             )
-        return cache[key]
+        )
+        return {(type_, uri): id_ for type_, uri, id_ in rows}
 
-    def _get_first(
-        self, session: Session, sqla_class: Instance | Work, uri: Node, cache: dict
-    ):
+    def _resource_id(
+        self, ids: dict[tuple[str, str], int], sqla_class, uri: Node
+    ) -> int:
         """
-        Look up the first object of the given type in the database and return it
-        or throw an exception.
+        The id of the resource of the given type with this uri, from the ones
+        _resource_ids found, or throw an exception if there isn't one.
         """
-        obj = self._resolve(session, sqla_class, uri, cache)
-        if obj is None:
+        id_ = ids.get((sqla_class.__tablename__, str(uri)))
+        if id_ is None:
             raise BluecoreGraphError(f"Unable to find in db: uri={uri}")
 
-        return obj
+        return id_
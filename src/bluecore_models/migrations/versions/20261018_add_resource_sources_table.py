@@ -0,0 +1,67 @@
+"""Add resource_sources table of the URIs resources were derived from
+
+Looking a source URI up by the jsonb_path_query_first expression index only
+finds a resource's first derivedFrom, and nothing stops two concurrent saves
+minting a resource each for the same source. resource_sources keeps every
+derivedFrom of the Hubs, Works and Instances as its own row, unique per type,
+so it can be joined on and a save can reserve a source by inserting it.
+Existing resources are backfilled; where two of a type share a source the
+oldest keeps it.
+
+Revision ID: 20261018
+Revises: 911a986691ba
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018"
+down_revision: str = "911a986691ba"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "resource_sources",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("source_uri", sa.String(), nullable=False),
+        sa.Column("resource_id", sa.Integer(), nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["resource_id"], ["resource_base.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "type", "source_uri", name="resource_sources_type_source_uri_key"
+        ),
+    )
+    op.create_index(
+        "index_resource_sources_on_resource_id",
+        "resource_sources",
+        ["resource_id"],
+        unique=False,
+    )
+
+    op.execute(
+        """
+        INSERT INTO resource_sources (source_uri, resource_id, type)
+        SELECT source.uri #>> '{}', resource_base.id, resource_base.type
+        FROM resource_base,
+            jsonb_path_query(
+                resource_base.data, '$.adminMetadata[*].derivedFrom."@id"'
+            ) AS source(uri)
+        WHERE resource_base.type IN ('hubs', 'works', 'instances')
+        ORDER BY resource_base.id
+        ON CONFLICT (type, source_uri) DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "index_resource_sources_on_resource_id", table_name="resource_sources"
+    )
+    op.drop_table("resource_sources")
@@ -15,5 +15,8 @@ from bluecore_models.models.other_resource import (
 )
 from bluecore_models.models.profile import Profile as Profile
 from bluecore_models.models.resource import ResourceBase as ResourceBase
+from bluecore_models.models.resource_source import (
+    ResourceSource as ResourceSource,
+)
 from bluecore_models.models.version import Version as Version
 from bluecore_models.models.work import Work as Work
@@ -13,8 +13,10 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 from bluecore_models.models.resource import ResourceBase
 from bluecore_models.utils.db import (
     add_bf_classes,
+    add_sources,
     add_version,
     update_bf_classes,
+    update_sources,
 )
 
 
@@ -39,16 +41,18 @@ class Hub(ResourceBase):
 @event.listens_for(Hub, "after_insert")
 def create_version_bf_classes(mapper: Any, connection: Connection, target: Hub):
     """
-    Creates a Version and associated Bibframe Classes
+    Creates a Version, associated Bibframe Classes and sources
     """
     add_version(connection, target)
     add_bf_classes(connection, target)
+    add_sources(connection, target)
 
 
 @event.listens_for(Hub, "after_update")
 def update_version_bf_classes(mapper: Any, connection: Connection, target: Hub):
     """
-    Updates a Version and associated Bibframe Classes
+    Updates a Version, associated Bibframe Classes and sources
     """
     add_version(connection, target)
     update_bf_classes(connection, target)
+    update_sources(connection, target)
@@ -17,8 +17,10 @@ from sqlalchemy.orm import (
 from bluecore_models.models.resource import ResourceBase
 from bluecore_models.utils.db import (
     add_bf_classes,
+    add_sources,
     add_version,
     update_bf_classes,
+    update_sources,
 )
 
 
@@ -43,16 +45,18 @@ class Instance(ResourceBase):
 @event.listens_for(Instance, "after_insert")
 def create_version_bf_classes(mapper: Any, connection: Connection, target: Instance):
     """
-    Creates a Version and associated Bibframe Classes
+    Creates a Version, associated Bibframe Classes and sources
     """
     add_version(connection, target)
     add_bf_classes(connection, target)
+    add_sources(connection, target)
 
 
 @event.listens_for(Instance, "after_update")
 def update_version_bf_classes(mapper: Any, connection: Connection, target: Instance):
     """
-    Updates a Version and associated Bibframe Classes
+    Updates a Version, associated Bibframe Classes and sources
     """
     add_version(connection, target)
     update_bf_classes(connection, target)
+    update_sources(connection, target)
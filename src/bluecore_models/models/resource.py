@@ -6,7 +6,6 @@ from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from bluecore_models.models.base import Base
-from bluecore_models.utils.graph import CONTEXT, frame_jsonld
 
 
 class ResourceBase(Base):
@@ -113,18 +112,28 @@ def set_jsonld(target, value, oldvalue, initiator) -> dict[str, Any] | None:
     Also, if the target is a Profile the data will not be framed, since
     sinopia-editor expects it to be in a particular shape. Maybe someday
     we can frame it?!
+
+    Data made by frame_graph is framed already, so it is stored as it is.
     """
     # Local import to avoid a circular import: profile.py imports ResourceBase
     # from this module. The data setter only fires on a constructed instance, by
     # which point all model modules are loaded.
     from bluecore_models.models.profile import Profile
 
+    # Local import too so that importing the models doesn't import rdflib and
+    # pyld, which only something writing resource data needs.
+    from bluecore_models.utils.graph import CONTEXT, FramedJsonLD, frame_jsonld
+
     if isinstance(target, Profile):
         return value
     elif target.uri is None and value is not None:
         raise ValueError(
             "For automatic jsonld framing to work you must ensure the uri property is set before the data property, even when constructing an object."
         )
+    elif isinstance(value, FramedJsonLD):
+        doc = dict(value)
+        doc.pop("@context", None)
+        return doc
     elif value is not None:
         if isinstance(value, dict) and "@context" not in value:
             # Our data in DB contains compact JSON-LD with namespaces.
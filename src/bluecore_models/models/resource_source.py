@@ -0,0 +1,34 @@
+"""Module for the sources Hubs, Works and Instances were derived from"""
+
+from sqlalchemy import ForeignKey, Index, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from bluecore_models.models.base import Base
+
+
+class ResourceSource(Base):
+    """
+    A URI a Hub, Work or Instance was derived from (the bf:derivedFrom of its
+    adminMetadata), one row per source. A source belongs to at most one
+    resource of each type, so two saves of the same record can't both mint a
+    resource for it. The rows follow the resources' data, see utils.db.
+    """
+
+    __tablename__ = "resource_sources"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    source_uri: Mapped[str] = mapped_column(String, nullable=False)
+    resource_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("resource_base.id", ondelete="CASCADE"), nullable=False
+    )
+    type: Mapped[str] = mapped_column(String, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "type", "source_uri", name="resource_sources_type_source_uri_key"
+        ),
+        Index("index_resource_sources_on_resource_id", "resource_id"),
+    )
+
+    def __repr__(self):
+        return f"<ResourceSource {self.source_uri} for {self.type}>"
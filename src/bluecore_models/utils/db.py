@@ -1,22 +1,59 @@
-import rdflib
-from sqlalchemy import delete, insert, select
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from sqlalchemy import delete, insert, inspect, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import object_session
 
 from bluecore_models.models.bf_classes import BibframeClass, ResourceBibframeClass
+from bluecore_models.models.resource_source import ResourceSource
 from bluecore_models.models.version import CURRENT_USER_ID, Version
-from bluecore_models.utils.graph import get_bf_classes
+from bluecore_models.utils import metrics
+
+if TYPE_CHECKING:
+    import rdflib
+
+# utils.graph, which these functions get the Bibframe classes of a resource
+# from, is imported by each of them rather than up here. The models import this
+# module, and utils.graph brings rdflib and pyld with it, which nothing that
+# only reads the models needs.
+
+
+class StoredResource(NamedTuple):
+    """
+    A resource written with SQL rather than through the ORM, for the functions
+    here that record what goes with it: the model event hooks that call them
+    don't fire for those writes. See BluecoreGraph._upsert_resources.
+    """
+
+    id: int
+    uri: str
+    data: Any
 
 
-def _new_bf_classs(connection, bf_class: rdflib.URIRef) -> int:
+def _new_bf_classs(connection, bf_class: "rdflib.URIRef") -> int:
     stmt = insert(BibframeClass.__table__).values(
         name=bf_class.split("/")[-1], uri=str(bf_class)
     )
     result = connection.execute(stmt)
+    metrics.get_registry().counter(
+        "bluecore_bf_classes_created_total", "Bibframe classes added to the database."
+    ).inc()
     return result.inserted_primary_key[0]
 
 
+def _count_bf_class_changes(change: str, amount: int) -> None:
+    metrics.get_registry().counter(
+        "bluecore_resource_bf_classes_total",
+        "Bibframe classes added to or removed from resources.",
+        ["change"],
+    ).inc(amount, change=change)
+
+
 def add_bf_classes(connection, resource):
     """Add Bibframe classes to a resource"""
+    from bluecore_models.utils.graph import get_bf_classes
+
     bf_classes = get_bf_classes(resource.data, resource.uri)
     for class_ in bf_classes:
         stmt = select(BibframeClass.__table__).where(BibframeClass.uri == str(class_))
@@ -28,6 +65,7 @@ def add_bf_classes(connection, resource):
             bf_class_id=bf_class_id, resource_id=resource.id
         )
         connection.execute(stmt)
+    _count_bf_class_changes("added", len(bf_classes))
 
 
 def add_version(connection, resource):
@@ -35,6 +73,12 @@ def add_version(connection, resource):
     Adds a Version if the resource had been modified.
     """
     uid = CURRENT_USER_ID.get()
+    versions = metrics.get_registry().counter(
+        "bluecore_versions_total",
+        "Resources flushed, by table and whether a Version was written or the "
+        "resource was unchanged.",
+        ["kind", "outcome"],
+    )
 
     if object_session(resource).is_modified(resource, include_collections=False):
         stmt = insert(Version.__table__).values(
@@ -44,10 +88,45 @@ def add_version(connection, resource):
             created_at=resource.updated_at,
         )
         connection.execute(stmt)
+        versions.inc(kind=resource.__tablename__, outcome="written")
+    else:
+        versions.inc(kind=resource.__tablename__, outcome="unchanged")
+
+
+def add_versions(
+    connection, kind: str, resources: list[StoredResource], created_at: datetime
+):
+    """
+    Adds a Version of each of the resources of kind (a table name), written at
+    created_at, in one statement.
+    """
+    if not resources:
+        return
+    uid = CURRENT_USER_ID.get()
+    stmt = insert(Version.__table__).values(
+        [
+            {
+                "resource_id": resource.id,
+                "data": resource.data,
+                "keycloak_user_id": uid,
+                "created_at": created_at,
+            }
+            for resource in resources
+        ]
+    )
+    connection.execute(stmt)
+    metrics.get_registry().counter(
+        "bluecore_versions_total",
+        "Resources flushed, by table and whether a Version was written or the "
+        "resource was unchanged.",
+        ["kind", "outcome"],
+    ).inc(len(resources), kind=kind, outcome="written")
 
 
 def update_bf_classes(connection, resource):
     """Update Bibframe classes for a resource"""
+    from bluecore_models.utils.graph import get_bf_classes
+
     bf_classes = get_bf_classes(resource.data, resource.uri)
     latest_bf_classes = {str(bf_class) for bf_class in bf_classes}
     stmt = (
@@ -79,3 +158,73 @@ def update_bf_classes(connection, resource):
             bf_class_id=bf_class_id, resource_id=resource.id
         )
         connection.execute(stmt)
+    _count_bf_class_changes("removed", len(removed_classes))
+    _count_bf_class_changes("added", len(added_classes))
+
+
+def derived_from_sources(data) -> set[str]:
+    """The @ids of the bf:derivedFrom of the adminMetadata in a resource's data"""
+    admin_metadata = data.get("adminMetadata", []) if isinstance(data, dict) else []
+    if isinstance(admin_metadata, dict):
+        admin_metadata = [admin_metadata]
+    sources = set()
+    for am in admin_metadata:
+        if not isinstance(am, dict):
+            continue
+        derived_from = am.get("derivedFrom", [])
+        if not isinstance(derived_from, list):
+            derived_from = [derived_from]
+        for source in derived_from:
+            if isinstance(source, dict) and "@id" in source:
+                sources.add(source["@id"])
+            elif isinstance(source, str):
+                sources.add(source)
+    return sources
+
+
+def add_sources(connection, resource):
+    """Record the sources a resource was derived from, see insert_sources"""
+    insert_sources(connection, resource.__tablename__, resource)
+
+
+def update_sources(connection, resource):
+    """Bring a resource's rows in resource_sources up to date with its data"""
+    if not inspect(resource).attrs.data.history.has_changes():
+        return
+    replace_sources(connection, resource.__tablename__, resource)
+
+
+def insert_sources(connection, kind: str, resource):
+    """
+    Record the sources a resource of kind (a table name) was derived from in
+    resource_sources. A source that already belongs to another resource of the
+    same kind is left with it: the insert waits for a save that has claimed it
+    but not yet committed, and then does nothing.
+    """
+    sources = derived_from_sources(resource.data)
+    if not sources:
+        return
+    stmt = (
+        pg_insert(ResourceSource.__table__)
+        .values(
+            [
+                {"source_uri": source, "resource_id": resource.id, "type": kind}
+                for source in sorted(sources)
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=["type", "source_uri"])
+    )
+    connection.execute(stmt)
+
+
+def replace_sources(connection, kind: str, resource):
+    """
+    Replace the rows in resource_sources of a resource of kind whose data has
+    changed with those of its data now.
+    """
+    stmt = delete(ResourceSource.__table__).where(
+        ResourceSource.resource_id == resource.id,
+        ResourceSource.source_uri.not_in(derived_from_sources(resource.data)),
+    )
+    connection.execute(stmt)
+    insert_sources(connection, kind, resource)
@@ -1,13 +1,19 @@
 """Utility functions for working with RDF graphs."""
 
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from functools import partial
+from io import BytesIO
 from typing import Any, NamedTuple
 
-from pyld import jsonld
 from rdflib import (
     DCTERMS,
     RDF,
     RDFS,
+    XSD,
     BNode,
     Graph,
     IdentifiedNode,
@@ -15,32 +21,12 @@ from rdflib import (
     Node,
     URIRef,
 )
-from rdflib.plugins import sparql
 
 from bluecore_models.namespaces import BF, BFLC, LCLOCAL, MADS
 
 logger = logging.getLogger(__name__)
 
-# Rewrites every occurrence of ?old_uri to ?new_uri in a graph, in both subject
-# position (?old_uri ?p ?o) and object position (?s ?pp ?old_uri).
-_REPLACE_URI_SPARQL = sparql.prepareUpdate("""
-DELETE {
-  ?old_uri ?p ?o .
-  ?s ?pp ?old_uri .
-}
-INSERT {
-  ?new_uri ?p ?o .
-  ?s ?pp ?new_uri .
-}
-WHERE {
-  {
-    ?old_uri ?p ?o .
-  }
-  UNION {
-    ?s ?pp ?old_uri .
-  }
-}
-""")
+Triple = tuple[Node, Node, Node]
 
 CONTEXT: dict[str, Any] = {
     "@vocab": "http://id.loc.gov/ontologies/bibframe/",
@@ -94,10 +80,33 @@ def replace_uri(graph: Graph, old_uri: IdentifiedNode, new_uri: URIRef) -> None:
     position (old_uri ?p ?o) and object position (?s ?pp old_uri). old_uri may be
     a blank node or a URIRef; new_uri is always a real (minted) URIRef.
     """
-    graph.update(
-        _REPLACE_URI_SPARQL,
-        initBindings={"old_uri": old_uri, "new_uri": new_uri},
-    )
+    replace_uris(graph, {old_uri: new_uri})
+
+
+def replace_uris(graph: Graph, mapping: Mapping[IdentifiedNode, URIRef]) -> None:
+    """
+    Rewrite every occurrence of each old uri (a key of mapping) to its new one (the
+    value), in both subject and object position, as replace_uri does for one.
+
+    The statements to change are found through the graph's subject and object
+    indexes and rewritten together, so renaming many resources costs what the
+    renamed statements do rather than a pass over the whole graph per resource.
+    A statement mentioning two old uris has both rewritten at once.
+    """
+    changed: dict[Triple, None] = {}
+    for old_uri in mapping:
+        changed.update(dict.fromkeys(graph.triples((old_uri, None, None))))
+        changed.update(dict.fromkeys(graph.triples((None, None, old_uri))))
+    for triple in changed:
+        graph.remove(triple)
+
+    def renamed(term: Node) -> Node:
+        if isinstance(term, IdentifiedNode):
+            return mapping.get(term, term)
+        return term
+
+    for s, p, o in changed:
+        graph.add((renamed(s), p, renamed(o)))
 
 
 def _check_for_namespace(node: Node) -> bool:
@@ -105,20 +114,230 @@ def _check_for_namespace(node: Node) -> bool:
     return node in LCLOCAL or node in DCTERMS  # type: ignore
 
 
+# A graph's statements grouped by subject, as predicate/object pairs (see
+# group_statements).
+Statements = dict[Node, list[tuple[Node, Node]]]
+
+
+def _kept_statements(graph: Graph, subject: Node) -> Iterator[tuple[Node, Node]]:
+    """subject's predicate/object pairs, less the ones entity graphs leave out."""
+    for pred, obj in graph.predicate_objects(subject=subject):
+        if not (_check_for_namespace(pred) or _check_for_namespace(obj)):
+            yield pred, obj
+
+
+def _walk_description(
+    describe: Callable[[Node], Iterable[tuple[Node, Node]]],
+    node: Node,
+    visited: set[Node],
+) -> Iterator[Triple]:
+    """
+    Yield node's statements, along with those of every blank node reachable from
+    it. describe gives the predicate/object pairs to copy for a subject.
+
+    The blank nodes are walked with an explicit stack rather than by recursion,
+    so a deeply nested description can't exhaust Python's recursion limit. visited
+    holds the nodes already copied (or queued to be): each is expanded once, which
+    is also what stops a cycle of blank nodes going round forever.
+    """
+    visited.add(node)
+    stack = [node]
+    while stack:
+        subject = stack.pop()
+        for pred, obj in describe(subject):
+            yield subject, pred, obj
+            if isinstance(obj, BNode) and obj not in visited:
+                visited.add(obj)
+                stack.append(obj)
+
+
 def _expand_bnode(graph: Graph, entity_graph: Graph, bnode: BNode) -> None:
     """Expand a blank node in the entity graph."""
 
-    # if the blank node is already present in the entity graph there's no need to add it
-    # this prevents infinite recursion
-    if bnode in entity_graph.subjects():
+    # if the blank node is already present in the entity graph there's no need to add it,
+    # and neither is there for any blank node that is -- this prevents infinite recursion
+    visited: set[Node] = {s for s in entity_graph.subjects() if isinstance(s, BNode)}
+    if bnode in visited:
         return
+    describe = partial(_kept_statements, graph)
+    for triple in _walk_description(describe, bnode, visited):
+        entity_graph.add(triple)
 
-    for pred, obj in graph.predicate_objects(subject=bnode):
-        if _check_for_namespace(pred) or _check_for_namespace(obj):
-            continue
-        entity_graph.add((bnode, pred, obj))
-        if isinstance(obj, BNode):
-            _expand_bnode(graph, entity_graph, obj)
+
+def group_statements(graph: Graph) -> Statements:
+    """
+    Group the graph's statements by subject in a single pass over it, leaving out
+    the ones an entity graph never carries (see _check_for_namespace). Every
+    subject in the graph is a key, even one whose statements were all left out.
+    """
+    statements: Statements = {}
+    for s, p, o in graph:
+        kept = statements.setdefault(s, [])
+        if not (_check_for_namespace(p) or _check_for_namespace(o)):
+            kept.append((p, o))
+    return statements
+
+
+def entity_statements(statements: Statements, entity: Node) -> list[Triple]:
+    """
+    The triples generate_entity_graph would copy for entity, taken from the output
+    of group_statements rather than by looking each subject up in the graph.
+    """
+    return list(_walk_description(lambda s: statements.get(s, ()), entity, set()))
+
+
+def describe_entity(graph: Graph, entity: Node) -> list[Triple]:
+    """
+    The triples generate_entity_graph would copy for entity, looked up in the
+    graph directly. Cheaper than group_statements when only a few entities are
+    wanted.
+    """
+    describe = partial(_kept_statements, graph)
+    return list(_walk_description(describe, entity, set()))
+
+
+def graph_from_triples(triples: Iterable[Triple]) -> Graph:
+    """Build a new graph, with our namespaces bound, holding the supplied triples."""
+    new_graph = init_graph()
+    for triple in triples:
+        new_graph.add(triple)
+    return new_graph
+
+
+class EntityView:
+    """
+    One resource's subgraph, as a view onto the graph it was extracted from.
+
+    A view holds the resource's subject, its kind (the BIBFRAME class it was
+    extracted as, or None for an Other Resource) and the triples it owns. The
+    triples are the parent graph's own terms rather than copies, and there is no
+    store or namespace manager per resource, so a record with hundreds of Other
+    Resources doesn't hold a second copy of itself.
+
+    It answers the lookups BluecoreGraph and rdflib's JSON-LD serializer make of a
+    subgraph. Anything wanting a real rdflib Graph -- to change it, say -- should
+    ask for one with to_graph().
+    """
+
+    __slots__ = ("_by_object", "_by_subject", "graph", "kind", "subject", "triples")
+
+    # read by rdflib's JSON-LD serializer: a view is a single, unnamed graph
+    context_aware = False
+    identifier = None
+
+    def __init__(
+        self, graph: Graph, subject: Node, kind: Node | None, triples: Iterable[Triple]
+    ):
+        self.graph = graph
+        self.subject = subject
+        self.kind = kind
+        self.triples = tuple(triples)
+        # built on first use, see _indexes
+        self._by_subject: dict[Node, list[Triple]] | None = None
+        self._by_object: dict[Node, list[Triple]] | None = None
+
+    def __repr__(self):
+        return f"<EntityView {self.subject} ({len(self.triples)} triples)>"
+
+    def __len__(self) -> int:
+        return len(self.triples)
+
+    def __iter__(self) -> Iterator[Triple]:
+        return iter(self.triples)
+
+    def __contains__(
+        self, triple: tuple[Node | None, Node | None, Node | None]
+    ) -> bool:
+        return any(True for _ in self.match(triple))
+
+    def _indexes(
+        self,
+    ) -> tuple[dict[Node, list[Triple]], dict[Node, list[Triple]]]:
+        """The triples by subject and by object, in their original order."""
+        if self._by_subject is None or self._by_object is None:
+            self._by_subject, self._by_object = {}, {}
+            for triple in self.triples:
+                self._by_subject.setdefault(triple[0], []).append(triple)
+                self._by_object.setdefault(triple[2], []).append(triple)
+        return self._by_subject, self._by_object
+
+    def match(
+        self, pattern: tuple[Node | None, Node | None, Node | None]
+    ) -> Iterator[Triple]:
+        """The triples matching pattern, where None matches anything."""
+        s, p, o = pattern
+        candidates: Iterable[Triple] = self.triples
+        if s is not None:
+            candidates = self._indexes()[0].get(s, ())
+        elif o is not None:
+            candidates = self._indexes()[1].get(o, ())
+        for triple in candidates:
+            if (
+                (s is None or triple[0] == s)
+                and (p is None or triple[1] == p)
+                and (o is None or triple[2] == o)
+            ):
+                yield triple
+
+    def subjects(
+        self, predicate: Node | None = None, object: Node | None = None
+    ) -> Iterator[Node]:
+        for s, _, _ in self.match((None, predicate, object)):
+            yield s
+
+    def objects(
+        self, subject: Node | None = None, predicate: Node | None = None
+    ) -> Iterator[Node]:
+        for _, _, o in self.match((subject, predicate, None)):
+            yield o
+
+    def subject_objects(
+        self, predicate: Node | None = None
+    ) -> Iterator[tuple[Node, Node]]:
+        for s, _, o in self.match((None, predicate, None)):
+            yield s, o
+
+    def predicate_objects(
+        self, subject: Node | None = None
+    ) -> Iterator[tuple[Node, Node]]:
+        for _, p, o in self.match((subject, None, None)):
+            yield p, o
+
+    def value(
+        self,
+        subject: Node | None = None,
+        predicate: Node | None = RDF.value,
+        object: Node | None = None,
+        default: Node | None = None,
+    ) -> Node | None:
+        """The first term completing the pattern, like rdflib's Graph.value."""
+        for s, p, o in self.match((subject, predicate, object)):
+            if subject is None:
+                return s
+            if predicate is None:
+                return p
+            return o
+        return default
+
+    def namespaces(self):
+        return self.graph.namespaces()
+
+    def to_graph(self) -> Graph:
+        """A real, independent rdflib Graph holding this resource's triples."""
+        return graph_from_triples(self.triples)
+
+    def serialize(self, format: str = "turtle", **kwargs: Any) -> str:
+        """
+        Serialize the resource like rdflib's Graph.serialize. JSON-LD is written
+        from the view itself; anything else goes by way of to_graph().
+        """
+        if format != "json-ld":
+            return self.to_graph().serialize(format=format, **kwargs)
+        from rdflib.plugins.serializers.jsonld import JsonLDSerializer
+
+        stream = BytesIO()
+        JsonLDSerializer(self).serialize(stream, **kwargs)  # type: ignore[arg-type]
+        return stream.getvalue().decode("utf-8")
 
 
 def _term_key(term: Node) -> str:
@@ -135,7 +354,7 @@ def _term_key(term: Node) -> str:
 
 
 def _bnode_fingerprint(
-    graph: Graph, bnode: BNode, ancestors: frozenset[BNode] = frozenset()
+    graph: Graph, bnode: BNode, memo: dict[BNode, str] | None = None
 ) -> str:
     """A content fingerprint for a blank node's subtree.
 
@@ -150,24 +369,53 @@ def _bnode_fingerprint(
 
     The parts are sorted, so the order statements arrived in makes no difference,
     and nested blank nodes are fingerprinted recursively so nesting is compared
-    structurally rather than by identifier.
+    structurally rather than by identifier. A nested node enters its parent's
+    fingerprint as a digest of its own, so a fingerprint stays the size of the
+    node's own statements however deep or shared the nesting below it.
+
+    memo holds fingerprints already worked out, and can be shared between calls
+    on the same graph so that a subtree is only fingerprinted once (see
+    _fingerprint for which ones are kept).
+    """
+    return _fingerprint(graph, bnode, set(), {} if memo is None else memo)[0]
+
+
+def _fingerprint(
+    graph: Graph, bnode: BNode, ancestors: set[BNode], memo: dict[BNode, str]
+) -> tuple[str, bool]:
+    """The fingerprint of bnode, and whether its subtree is free of cycles.
 
     ancestors is the path from the outermost node to this one, which is how a cycle
-    is spotted. It is a frozenset, and a fresh one is passed at each level, so a
-    blank node reachable from two different branches is still fingerprinted in full
-    in both -- a single set shared across the recursion would report the second
-    occurrence as a cycle and give the wrong answer.
+    is spotted: a node met again on its own path is fingerprinted as "<cycle>".
+    Each node is taken off the path again once its subtree is done, so a blank
+    node reachable from two different branches is still fingerprinted in full in
+    both -- leaving it on would report the second occurrence as a cycle and give
+    the wrong answer.
+
+    A subtree with a cycle fingerprints differently depending on where it was
+    entered from, so only the fingerprints of cycle-free subtrees, which are the
+    same from anywhere, are kept in memo.
     """
+    if bnode in memo:
+        return memo[bnode], True
     if bnode in ancestors:
-        return "<cycle>"
+        return "<cycle>", False
+    ancestors.add(bnode)
+    acyclic = True
     parts = []
     for pred, obj in graph.predicate_objects(subject=bnode):
         if isinstance(obj, BNode):
-            key = _bnode_fingerprint(graph, obj, ancestors | {bnode})
+            key, obj_acyclic = _fingerprint(graph, obj, ancestors, memo)
+            key = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+            acyclic = acyclic and obj_acyclic
         else:
             key = _term_key(obj)
         parts.append(f"{_term_key(pred)} {key}")
-    return "{" + "|".join(sorted(parts)) + "}"
+    ancestors.discard(bnode)
+    fingerprint = "{" + "|".join(sorted(parts)) + "}"
+    if acyclic:
+        memo[bnode] = fingerprint
+    return fingerprint, acyclic
 
 
 class DuplicateValue(NamedTuple):
@@ -241,11 +489,13 @@ def find_duplicate_bnode_values(graph: Graph) -> list[DuplicateValue]:
     Read-only: reports what it finds and changes nothing.
     """
     duplicates = []
+    memo: dict[BNode, str] = {}
     for subject, predicate in set(graph.subject_predicates()):
         by_content: dict[str, list[BNode]] = {}
         for obj in graph.objects(subject=subject, predicate=predicate):
             if isinstance(obj, BNode):
-                by_content.setdefault(_bnode_fingerprint(graph, obj), []).append(obj)
+                fingerprint = _bnode_fingerprint(graph, obj, memo)
+                by_content.setdefault(fingerprint, []).append(obj)
         for nodes in by_content.values():
             if len(nodes) > 1:
                 duplicates.append(
@@ -261,14 +511,7 @@ def find_duplicate_bnode_values(graph: Graph) -> list[DuplicateValue]:
 
 def generate_entity_graph(graph: Graph, entity: Node) -> Graph:
     """Generate an entity graph from a larger RDF graph."""
-    entity_graph = init_graph()
-    for pred, obj in graph.predicate_objects(subject=entity):
-        if _check_for_namespace(pred) or _check_for_namespace(obj):
-            continue
-        entity_graph.add((entity, pred, obj))
-        if isinstance(obj, BNode):
-            _expand_bnode(graph, entity_graph, obj)
-    return entity_graph
+    return graph_from_triples(describe_entity(graph, entity))
 
 
 def get_bf_classes(rdf_data: list[Any] | dict[str, Any], uri: str) -> list:
@@ -281,10 +524,158 @@ def get_bf_classes(rdf_data: list[Any] | dict[str, Any], uri: str) -> list:
     return classes
 
 
+class DocumentLoader:
+    """
+    A pyld document loader that never goes to the network unless asked to.
+    Documents registered with add (or passed in) are always available; anything
+    else is handed to the fallback loader, if there is one, and the most
+    recently used maxsize of those are kept in memory. With no fallback -- the
+    default -- an unknown URL is a JsonLdError, so framing a payload with a
+    remote @context fails fast instead of blocking. To fetch them, pass a
+    fallback that does:
+
+        >>> from pyld.jsonld import requests_document_loader
+        >>> set_document_loader(
+        ...     DocumentLoader(fallback=requests_document_loader(timeout=5))
+        ... )
+    """
+
+    def __init__(
+        self,
+        documents: Mapping[str, Any] | None = None,
+        fallback: Callable[..., dict[str, Any]] | None = None,
+        maxsize: int = 64,
+    ):
+        self.documents = dict(documents or {})
+        self.fallback = fallback
+        self.maxsize = maxsize
+        # shared by the threads framing with this loader
+        self._cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, url: str, document: Any) -> None:
+        """Make document available at url."""
+        self.documents[url] = document
+
+    def __call__(self, url: str, options: dict[str, Any] | None = None):
+        if url in self.documents:
+            return {
+                "contentType": "application/ld+json",
+                "contextUrl": None,
+                "documentUrl": url,
+                "document": self.documents[url],
+            }
+        with self._lock:
+            remote_doc = self._cache.get(url)
+            if remote_doc is not None:
+                self._cache.move_to_end(url)
+                return remote_doc
+
+        if self.fallback is None:
+            from pyld import jsonld
+
+            raise jsonld.JsonLdError(
+                f"{url} is not available offline",
+                "jsonld.LoadDocumentError",
+                {"url": url},
+                code="loading document failed",
+            )
+        remote_doc = self.fallback(url, options or {})
+        with self._lock:
+            self._cache[url] = remote_doc
+            self._cache.move_to_end(url)
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return remote_doc
+
+
+_document_loader: Callable[..., dict[str, Any]] = DocumentLoader()
+
+
+def set_document_loader(loader: Callable[..., dict[str, Any]]) -> None:
+    """Set the document loader frame_jsonld uses for remote contexts."""
+    global _document_loader
+    _document_loader = loader
+
+
+def get_document_loader() -> Callable[..., dict[str, Any]]:
+    """Get the document loader frame_jsonld uses for remote contexts."""
+    return _document_loader
+
+
+class _ResolvedContext:
+    """
+    CONTEXT as pyld's context processing takes it: the document, and what it
+    processes to against each active context it is applied to, keeping the most
+    recent few.
+    """
+
+    maxsize = 16
+
+    def __init__(self, document: dict[str, Any]):
+        self.document = document
+        self._processed: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_processed(self, active_ctx: Mapping[str, Any]) -> Any:
+        with self._lock:
+            return self._processed.get(active_ctx.get("_uuid", ""))
+
+    def set_processed(self, active_ctx: Mapping[str, Any], processed: Any) -> None:
+        key = active_ctx.get("_uuid")
+        if key is None:
+            return
+        with self._lock:
+            self._processed[key] = processed
+            if len(self._processed) > self.maxsize:
+                self._processed.popitem(last=False)
+
+
+_resolved_context = _ResolvedContext(CONTEXT)
+
+
+class _ContextResolver:
+    """
+    Resolves contexts for frame_jsonld (pyld's contextResolver option). CONTEXT
+    is resolved once for the life of the process: pyld's own resolver keys the
+    contexts it has resolved by a canonical serialization, which it recomputes
+    for every context in every call, and which the contexts of incoming payloads
+    can evict. pyld copies the frame before expanding it, so CONTEXT is
+    recognised by value.
+
+    Any other context is left to a pyld ContextResolver made for the call, with
+    a cache of its own, so that a remote context comes from the document loader
+    the call was made with and not from what an earlier call loaded.
+    """
+
+    def __init__(self, document_loader: Callable[..., dict[str, Any]]):
+        from pyld.context_resolver import ContextResolver
+
+        self._resolver = ContextResolver({}, document_loader)
+
+    def resolve(self, active_ctx, context, base, cycles=None) -> list:
+        if isinstance(context, Mapping) and "@context" in context:
+            context = context["@context"]
+        contexts = context if isinstance(context, list) else [context]
+        if not any(isinstance(ctx, Mapping) and ctx == CONTEXT for ctx in contexts):
+            return self._resolver.resolve(active_ctx, context, base, cycles)
+
+        resolved = []
+        for ctx in contexts:
+            if isinstance(ctx, Mapping) and ctx == CONTEXT:
+                resolved.append(_resolved_context)
+            else:
+                resolved.extend(self._resolver.resolve(active_ctx, [ctx], base, cycles))
+        return resolved
+
+
 def frame_jsonld(
     bluecore_uri: str, jsonld_data: list[Any] | dict[str, Any]
 ) -> dict[str, Any]:
     """Frames the JSON-LD data to a specific structure."""
+    from pyld import jsonld
+
+    document_loader = _document_loader
     return jsonld.frame(
         jsonld_data,
         {
@@ -292,4 +683,288 @@ def frame_jsonld(
             "@id": bluecore_uri,
             "@embed": "@always",
         },
+        {
+            "documentLoader": document_loader,
+            "contextResolver": _ContextResolver(document_loader),
+        },
+    )
+
+
+class FramedJsonLD(dict):
+    """
+    JSON-LD for a resource that is already in the shape frame_jsonld gives it, as
+    made by frame_graph. The ResourceBase.data setter stores it as it is rather
+    than framing it a second time.
+    """
+
+
+# rdflib's JSON-LD serializer writes literals of these datatypes as JSON
+# booleans, numbers and strings, which framing carries through as they are.
+_NATIVE_LITERAL_TYPES = {XSD.boolean, XSD.integer, XSD.double, XSD.string}
+
+_GEN_DELIMS = (":", "/", "?", "#", "[", "]", "@")
+
+
+class _Compactor:
+    """
+    Compacts IRIs against a JSON-LD context the way pyld does, for the kinds of
+    term definition CONTEXT uses: @vocab, prefixes, and terms coerced to @id.
+    """
+
+    def __init__(self, context: Mapping[str, Any]):
+        self.vocab: str | None = context.get("@vocab")
+        self.mappings = {term for term in context if not term.startswith("@")}
+        # candidate terms for an IRI, best first, and whether each is coerced
+        self.terms: dict[str, list[tuple[str, bool]]] = {}
+        self.prefixes: list[tuple[str, str]] = []
+        for term in sorted(self.mappings, key=lambda t: (len(t), t)):
+            definition = context[term]
+            if isinstance(definition, str):
+                self.terms.setdefault(definition, []).append((term, False))
+                if definition.endswith(_GEN_DELIMS):
+                    self.prefixes.append((term, definition))
+            elif definition.get("@type") == "@id" and set(definition) <= {
+                "@id",
+                "@type",
+            }:
+                iri = definition.get("@id", f"{self.vocab}{term}")
+                self.terms.setdefault(iri, []).append((term, True))
+            else:
+                raise ValueError(f"Unsupported term definition for {term}")
+        self.coerced = {t for ts in self.terms.values() for t, c in ts if c}
+        self._cache: dict[tuple[str, bool, bool], str] = {}
+
+    def iri(self, iri: str, vocab: bool, node: bool = True) -> str:
+        """
+        Compact iri: as a property or type when vocab is True, otherwise as the
+        @id of a node. node says whether the value it is for is a node (or no
+        value at all), which terms coerced to @id only ever stand for.
+        """
+        key = (iri, vocab, node)
+        compacted = self._cache.get(key)
+        if compacted is None:
+            compacted = self._cache[key] = self._compact(iri, vocab, node)
+        return compacted
+
+    def _compact(self, iri: str, vocab: bool, node: bool) -> str:
+        if vocab:
+            for term, coerced in self.terms.get(iri, []):
+                if node or not coerced:
+                    return term
+            if self.vocab and iri.startswith(self.vocab) and iri != self.vocab:
+                suffix = iri[len(self.vocab) :]
+                if suffix not in self.mappings:
+                    return suffix
+        curies = [
+            f"{prefix}:{iri[len(namespace) :]}"
+            for prefix, namespace in self.prefixes
+            if iri.startswith(namespace) and iri != namespace
+        ]
+        curies = [curie for curie in curies if curie not in self.mappings]
+        if curies:
+            return min(curies, key=lambda curie: (len(curie), curie))
+        return iri
+
+
+_COMPACTOR = _Compactor(CONTEXT)
+
+
+class _Framer:
+    """
+    Builds the framed, compacted JSON-LD for one node of a graph. See frame_graph.
+
+    Framing happens in two steps, as in pyld: the node is first embedded with
+    everything it refers to, counting how often each blank node turns up, and
+    then compacted, dropping the identifiers of blank nodes that turned up once.
+    """
+
+    def __init__(self, graph: Graph | EntityView, compactor: _Compactor):
+        self.graph = graph
+        self.compactor = compactor
+        self.statements: dict[Node, list[tuple[Node, Node]]] = {}
+        self.bnode_counts: dict[Node, int] = {}
+        self.bnode_labels: dict[Node, str] = {}
+
+    def _statements(self, node: Node) -> list[tuple[Node, Node]]:
+        statements = self.statements.get(node)
+        if statements is None:
+            statements = self.statements[node] = list(
+                self.graph.predicate_objects(node)  # type: ignore[arg-type]
+            )
+        return statements
+
+    def _collection(self, node: Node) -> list[Node | None] | None:
+        """The members of the rdf:List node heads, as rdflib's serializer finds them."""
+        if node != RDF.nil:
+            first = next((o for p, o in self._statements(node) if p == RDF.first), None)
+            if not first:
+                return None
+        items: list[Node | None] = []
+        chain: set[Node | None] = {node}
+        current: Node | None = node
+        while current:
+            if current == RDF.nil:
+                return items
+            if isinstance(current, URIRef):
+                return None
+            first, rest = None, None
+            for p, o in self._statements(current):
+                if not first and p == RDF.first:
+                    first = o
+                elif not rest and p == RDF.rest:
+                    rest = o
+                elif p != RDF.type or o != RDF.List:
+                    return None
+            items.append(first)
+            current = rest
+            if current in chain:
+                return None
+            chain.add(current)
+        return None
+
+    def _embed(self, node: Node, ancestors: list[Node]) -> dict[Any, Any]:
+        """
+        The node with its types and property values, embedding every node it
+        refers to -- except one it is already inside, which would never end.
+        Like pyld, a node referring back to the one it sits in directly is
+        embedded once more before the cycle is cut.
+        """
+        output: dict[Any, Any] = {"@id": node}
+        if isinstance(node, BNode):
+            self.bnode_counts[node] = self.bnode_counts.get(node, 0) + 1
+        if node in ancestors[:-1]:
+            return output
+        ancestors.append(node)
+        types: list[Node] = []
+        values: dict[Node, list[Any]] = {}
+        seen: set[tuple] = set()
+        for p, o in self._statements(node):
+            if p == RDF.type and isinstance(o, URIRef):
+                if o not in types:
+                    types.append(o)
+                continue
+            value = self._value(o, ancestors)
+            if value is None:
+                continue
+            if "@value" in value:
+                # literals that read the same, like "1" and "01" as integers,
+                # come out as one value
+                key = (p, value.get("@type"), value.get("@language"), value["@value"])
+                if key in seen:
+                    continue
+                seen.add(key)
+            values.setdefault(p, []).append(value)
+        ancestors.pop()
+        if types:
+            output["@type"] = types
+        output.update(values)
+        return output
+
+    def _value(self, o: Node | None, ancestors: list[Node]) -> dict[str, Any] | None:
+        if o is None:
+            return None
+        items = self._collection(o)
+        if items is not None:
+            return {
+                "@list": [
+                    value
+                    for value in (self._value(item, ancestors) for item in items)
+                    if value is not None
+                ]
+            }
+        if isinstance(o, Literal):
+            if o.datatype:
+                v = o.toPython() if o.datatype in _NATIVE_LITERAL_TYPES else str(o)
+                if isinstance(v, Literal):
+                    v = str(v)
+                return {"@type": o.datatype, "@value": v}
+            if o.language:
+                return {"@language": o.language.lower(), "@value": str(o)}
+            return {"@value": str(o)}
+        return self._embed(o, ancestors)
+
+    def _id(self, node: Node) -> str:
+        if isinstance(node, BNode):
+            label = self.bnode_labels.get(node)
+            if label is None:
+                label = self.bnode_labels[node] = f"_:b{len(self.bnode_labels)}"
+            return label
+        return self.compactor.iri(str(node), vocab=False)
+
+    def _is_node(self, value: dict[str, Any]) -> bool:
+        if "@list" in value:
+            return all(self._is_node(item) for item in value["@list"])
+        return "@value" not in value
+
+    def _compact_node(self, node: dict[str, Any]) -> dict[str, Any]:
+        compact = self.compactor
+        output: dict[str, Any] = {}
+        for key, values in node.items():
+            if key == "@id":
+                if not isinstance(values, BNode) or self.bnode_counts[values] > 1:
+                    output["@id"] = self._id(values)
+            elif key == "@type":
+                types = [compact.iri(str(t), vocab=True) for t in values]
+                output["@type"] = types[0] if len(types) == 1 else types
+            else:
+                for value in values:
+                    term = compact.iri(str(key), vocab=True, node=self._is_node(value))
+                    output.setdefault(term, []).append(
+                        self._compact_value(value, term in compact.coerced)
+                    )
+        for key, values in output.items():
+            if isinstance(values, list) and len(values) == 1 and key != "@type":
+                output[key] = values[0]
+        return output
+
+    def _compact_value(self, value: dict[str, Any], coerced: bool) -> Any:
+        if "@list" in value:
+            return {
+                "@list": [self._compact_value(item, coerced) for item in value["@list"]]
+            }
+        if "@value" in value:
+            if "@type" in value:
+                datatype = self.compactor.iri(str(value["@type"]), vocab=True)
+                return {"@type": datatype, "@value": value["@value"]}
+            if "@language" in value:
+                return {"@language": value["@language"], "@value": value["@value"]}
+            return value["@value"]
+        compacted = self._compact_node(value)
+        if list(compacted) == ["@id"] and coerced:
+            return compacted["@id"]
+        return compacted
+
+    def frame(self, subject: Node) -> dict[str, Any]:
+        return self._compact_node(self._embed(subject, []))
+
+
+def frame_graph(
+    bluecore_uri: str, graph: Graph | EntityView, context: Mapping[str, Any] = CONTEXT
+) -> FramedJsonLD:
+    """
+    Frames a resource straight from its graph (or EntityView), giving what
+    frame_jsonld would for the graph serialized as JSON-LD, without the round
+    trip through a JSON-LD document, pyld expansion and compaction.
+
+    Values come in the order the graph gives them, and each node the resource
+    refers to is embedded wherever it is referred to (@embed: @always). The one
+    difference is in naming blank nodes that have to keep an identifier (one
+    referred to from more than one place): they are numbered in the order they
+    are met, where pyld's numbering follows rdflib's serialization.
+    """
+    compactor = _COMPACTOR if context is CONTEXT else _Compactor(context)
+    framed = FramedJsonLD(_Framer(graph, compactor).frame(URIRef(bluecore_uri)))
+    framed["@context"] = context
+    return framed
+
+
+def frame_triples(bluecore_uri: str, triples: Iterable[Triple]) -> FramedJsonLD:
+    """
+    Frames a resource from its triples, in the order given, as frame_graph would
+    frame an EntityView holding them. It is what a worker process runs when
+    BluecoreGraph.save is given an executor: a view refers to the whole graph it
+    came from, and the triples are all the framing needs.
+    """
+    return frame_graph(
+        bluecore_uri, EntityView(Graph(), URIRef(bluecore_uri), None, triples)
     )
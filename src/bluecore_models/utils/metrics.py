@@ -0,0 +1,275 @@
+"""
+Counters and histograms for the save path, in the Prometheus text format.
+
+Nothing is recorded until a Registry is installed with set_registry: the
+default NullRegistry throws everything away, so code that reports into it costs
+next to nothing for callers that don't care. A worker that does installs one at
+start-up and serves, or periodically writes out, what render() gives it:
+
+    registry = metrics.Registry()
+    metrics.set_registry(registry)
+    ...
+    registry.write("/var/lib/node_exporter/textfile/bluecore.prom")
+
+Metrics are looked up by name as they are reported, so they are created the
+first time something reports into them and can be reported into from anywhere.
+"""
+
+import math
+import os
+import tempfile
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+
+# Prometheus' own default buckets, stretched to take in the slowest saves.
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+class Metric:
+    """A named metric, with a value for each combination of its labels."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...], extra: str = "") -> str:
+        pairs = [
+            f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)
+        ]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> Iterator[str]:
+        """The sample lines of the metric in the Prometheus text format."""
+        return iter(())
+
+
+class Counter(Metric):
+    """A count that only goes up, such as of saves or of resources written."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError(f"{self.name} can only go up, not by {amount}")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{self._labels(key)} {_number(value)}"
+
+
+class Histogram(Metric):
+    """How many observations, such as of save latency, fell in each bucket."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # for each combination of labels, the count in each bucket (not
+        # cumulative, the last for +Inf) and the sum of the observations
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        bucket = next(
+            (i for i, bound in enumerate(self.buckets) if value <= bound),
+            len(self.buckets),
+        )
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[bucket] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            counts, _ = self._values.get(self._key(labels), ([], [0.0]))
+            return sum(counts)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(
+                (key, (list(counts), total[0]))
+                for key, (counts, total) in self._values.items()
+            )
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{self._labels(key, le)} {cumulative}"
+            yield f"{self.name}_sum{self._labels(key)} {_number(total)}"
+            yield f"{self.name}_count{self._labels(key)} {cumulative}"
+
+
+class Registry:
+    """The metrics a process has reported, by name."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        """The Counter called name, made the first time it is asked for."""
+        return self._get(Counter, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """The Histogram called name, made the first time it is asked for."""
+        return self._get(Histogram, name, documentation, labelnames, buckets)
+
+    def _get(self, type_, name, documentation, labelnames, *args):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = type_(name, documentation, labelnames, *args)
+                    self._metrics[name] = metric
+        if type(metric) is not type_ or metric.labelnames != tuple(labelnames):
+            raise ValueError(
+                f"{name} is already a {metric.kind} with labels {metric.labelnames}"
+            )
+        return metric
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for name, metric in metrics:
+            lines.append(f"# HELP {name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "".join(f"{line}\n" for line in lines)
+
+    def write(self, path: str | os.PathLike) -> None:
+        """
+        Write render() to path for a textfile collector to pick up. The file is
+        replaced in one go, so a scrape never sees half of it.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as fh:
+                fh.write(self.render())
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+class _NullCounter(Counter):
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        pass
+
+
+class _NullHistogram(Histogram):
+    def observe(self, value: float, **labels: str) -> None:
+        pass
+
+
+class NullRegistry(Registry):
+    """A Registry that records nothing, which is what reports go to by default."""
+
+    _counter = _NullCounter("null", "", ())
+    _histogram = _NullHistogram("null", "", ())
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self._counter
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._histogram
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+_registry: Registry = NullRegistry()
+
+
+def set_registry(registry: Registry) -> None:
+    """
+    Report metrics from now on into registry, or into nothing if it is a
+    NullRegistry.
+    """
+    global _registry
+    _registry = registry
+
+
+def get_registry() -> Registry:
+    """The Registry metrics are reported into."""
+    return _registry
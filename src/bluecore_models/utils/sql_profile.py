@@ -0,0 +1,198 @@
+"""
+A client-side pg_stat_statements: how often each shape of SQL statement is run
+and how long it takes, for finding the expensive queries of a save.
+
+    profiler = StatementProfiler(engine)
+    ...
+    print(profiler.profile.format())
+    profiler.close()
+
+Statements are grouped by shape: their SQL with literals and bind parameters
+replaced by ?, and with IN lists and multi-row VALUES collapsed, so the same
+statement with different values, or a different number of them, counts as one.
+
+Besides the totals for as long as the profiler listens, the statements run
+inside ``with statement_stats() as profile:`` are gathered into profile too --
+those of a single save, say, which is how BluecoreGraph.save puts them in its
+SaveReport. Which block a statement belongs to follows the context it is run
+in, so saves in different threads are kept apart.
+"""
+
+import random
+import re
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Self
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# How many latencies of each shape of statement are kept to take percentiles
+# from. Beyond that they are a uniform sample of all of them.
+SAMPLE_SIZE = 1024
+
+_PARAMETER = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_IN_LIST = re.compile(r"\bIN \(\?(?:, \?)*\)", re.IGNORECASE)
+_REPEATED_ROW = re.compile(r"(\([^()]*\))(?:, \1)+")
+
+
+@lru_cache(maxsize=4096)
+def normalize_statement(statement: str) -> str:
+    """The shape of a SQL statement, which statements are grouped by."""
+    shape = " ".join(statement.split())
+    shape = _STRING.sub("?", shape)
+    shape = _PARAMETER.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _IN_LIST.sub("IN (...)", shape)
+    return _REPEATED_ROW.sub(r"\1", shape)
+
+
+class StatementStats:
+    """The calls to one shape of statement, and how long they took."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._samples: list[float] = []
+        self._random = random.Random(0)
+
+    def add(self, seconds: float) -> None:
+        self.calls += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self._samples) < SAMPLE_SIZE:
+            self._samples.append(seconds)
+        else:
+            slot = self._random.randrange(self.calls)
+            if slot < SAMPLE_SIZE:
+                self._samples[slot] = seconds
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """The latency percent of the calls took no longer than."""
+        if not self._samples:
+            return 0.0
+        samples = sorted(self._samples)
+        rank = max(0, round(percent / 100 * len(samples)) - 1)
+        return samples[min(rank, len(samples) - 1)]
+
+
+class StatementProfile:
+    """StatementStats by statement shape."""
+
+    def __init__(self) -> None:
+        self.statements: dict[str, StatementStats] = {}
+        self._lock = threading.Lock()
+
+    def add(self, shape: str, seconds: float) -> None:
+        with self._lock:
+            stats = self.statements.get(shape)
+            if stats is None:
+                stats = self.statements[shape] = StatementStats()
+            stats.add(seconds)
+
+    @property
+    def calls(self) -> int:
+        return sum(stats.calls for stats in self.statements.values())
+
+    @property
+    def total(self) -> float:
+        return sum(stats.total for stats in self.statements.values())
+
+    def top(self, n: int | None = None) -> list[tuple[str, StatementStats]]:
+        """The n shapes of statement that took longest altogether, longest first."""
+        with self._lock:
+            ranked = sorted(
+                self.statements.items(), key=lambda item: item[1].total, reverse=True
+            )
+        return ranked[:n]
+
+    def format(self, n: int | None = 20, width: int = 100) -> str:
+        """A table of the top n shapes of statement, cut to width characters."""
+        header = (
+            f"{'calls':>7} {'total ms':>10} {'mean ms':>8} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}  statement"
+        )
+        lines = [header]
+        for shape, stats in self.top(n):
+            if len(shape) > width:
+                shape = shape[: width - 3] + "..."
+            lines.append(
+                f"{stats.calls:7d} {stats.total * 1000:10.1f} "
+                f"{stats.mean * 1000:8.2f} {stats.percentile(50) * 1000:8.2f} "
+                f"{stats.percentile(95) * 1000:8.2f} "
+                f"{stats.percentile(99) * 1000:8.2f} {stats.max * 1000:8.2f}  {shape}"
+            )
+        return "\n".join(lines)
+
+
+# The profiles of the statement_stats blocks the current context is in.
+_collecting: ContextVar[tuple[StatementProfile, ...]] = ContextVar(
+    "bluecore_statement_stats", default=()
+)
+
+
+@contextmanager
+def statement_stats() -> Iterator[StatementProfile]:
+    """
+    Gather the statements that a StatementProfiler sees run inside the block
+    into the profile it yields. Without a profiler listening it stays empty.
+    """
+    profile = StatementProfile()
+    token = _collecting.set(_collecting.get() + (profile,))
+    try:
+        yield profile
+    finally:
+        _collecting.reset(token)
+
+
+class StatementProfiler:
+    """
+    Times every statement run through engine, from when it is handed to the
+    DBAPI cursor to when the cursor returns, into profile, until closed.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.profile = StatementProfile()
+        # where each statement's start time is kept on its connection, which
+        # is particular to this profiler in case there is more than one
+        self._key = f"bluecore_statement_start_{id(self)}"
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def close(self) -> None:
+        """Stop listening to the engine."""
+        event.remove(self.engine, "before_cursor_execute", self._before)
+        event.remove(self.engine, "after_cursor_execute", self._after)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        # a connection runs one statement at a time, and one that fails never
+        # gets to _after, so the next statement's start can simply replace it
+        conn.info[self._key] = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        start = conn.info.pop(self._key, None)
+        if start is None:
+            return
+        seconds = time.perf_counter() - start
+        shape = normalize_statement(statement)
+        self.profile.add(shape, seconds)
+        for profile in _collecting.get():
+            profile.add(shape, seconds)
@@ -0,0 +1,257 @@
+"""A compact, array-backed rdflib store for the graphs BluecoreGraph works on."""
+
+from array import array
+from collections.abc import Iterable, Iterator
+from itertools import accumulate, chain
+
+from rdflib import Graph, Node, URIRef
+from rdflib.store import Store
+
+from bluecore_models.utils.graph import Triple
+
+# Rows an ArrayStore lets pile up outside its sorted indexes, or lets lie dead,
+# before it tidies up. Either is allowed to grow in proportion to the store too,
+# so that the tidying is paid for a little at a time.
+_MIN_TAIL = 4096
+_MIN_DEAD = 4096
+
+
+class ArrayStore(Store):
+    """
+    An rdflib Store holding a single graph of triples as three columns of
+    integer term ids, with each distinct term held once.
+
+    rdflib's Memory store keeps each triple in nested dictionaries, three times
+    over, plus another recording which graphs it belongs to. Here a triple is a
+    row of three machine integers, and each column has an index of the rows
+    sorted by it, with the offset in it at which each term's rows start, so a
+    lookup by term is a slice. Rows added since an index was sorted are found
+    through a small per-term tail until there are enough of them to be worth
+    sorting in, and removed rows are marked dead and dropped once enough of them
+    accumulate, so a save's steady trickle of changes never re-sorts the whole
+    store.
+
+    Triples come back in the order they were added, for any lookup -- where the
+    Memory store's order follows its hashing.
+
+    Use it through an rdflib Graph, see compact_graph.
+    """
+
+    context_aware = False
+    formula_aware = False
+    graph_aware = False
+    transaction_aware = False
+
+    def __init__(self, configuration: str | None = None, identifier=None):
+        super().__init__(configuration)
+        self.identifier = identifier
+        self._ids: dict[Node, int] = {}
+        self._terms: list[Node] = []
+        self._columns: tuple[array, ...] = (array("q"), array("q"), array("q"))
+        self._alive = bytearray()
+        self._live = 0
+        # the rows before _indexed, sorted (stably) by each column, and where
+        # the rows of each term id start in them
+        self._indexes: tuple[array, ...] = (array("q"), array("q"), array("q"))
+        self._offsets: tuple[array, ...] = (array("q"), array("q"), array("q"))
+        self._indexed = 0
+        # the rows from _indexed on, by term id, for each column
+        self._tail: tuple[dict[int, list[int]], ...] = ({}, {}, {})
+        self._namespace: dict[str, URIRef] = {}
+        self._prefix: dict[URIRef, str] = {}
+
+    def _intern(self, term: Node) -> int:
+        term_id = self._ids.get(term)
+        if term_id is None:
+            term_id = self._ids[term] = len(self._terms)
+            self._terms.append(term)
+        return term_id
+
+    def _count(self, column: int, term_id: int) -> int:
+        """How many rows, dead or alive, have term_id in column."""
+        offsets = self._offsets[column]
+        count = len(self._tail[column].get(term_id, ()))
+        if term_id + 1 < len(offsets):
+            count += offsets[term_id + 1] - offsets[term_id]
+        return count
+
+    def _rows(self, column: int, term_id: int) -> Iterable[int]:
+        """The rows, dead or alive, with term_id in column, in the order added."""
+        offsets = self._offsets[column]
+        rows: Iterable[int] = ()
+        if term_id + 1 < len(offsets):
+            rows = self._indexes[column][offsets[term_id] : offsets[term_id + 1]]
+        tail = self._tail[column].get(term_id)
+        return chain(rows, tail) if tail else rows
+
+    def _matching_rows(self, triple_pattern) -> Iterable[int]:
+        bound = []
+        for column, term in enumerate(triple_pattern):
+            if term is not None:
+                term_id = self._ids.get(term)
+                if term_id is None:
+                    return ()
+                bound.append((column, term_id))
+
+        alive = self._alive
+        if not bound:
+            return (row for row in range(len(alive)) if alive[row])
+
+        # go through the rows of whichever bound term has fewest, checking the
+        # others against the columns
+        if len(bound) > 1:
+            bound.sort(key=lambda b: self._count(*b))
+        rows = self._rows(*bound[0])
+        if len(bound) == 1:
+            if self._live == len(alive):
+                return rows
+            return (row for row in rows if alive[row])
+        (c1, t1), *more = bound[1:]
+        v1 = self._columns[c1]
+        if not more:
+            return (row for row in rows if v1[row] == t1 and alive[row])
+        c2, t2 = more[0]
+        v2 = self._columns[c2]
+        return (row for row in rows if v1[row] == t1 and v2[row] == t2 and alive[row])
+
+    def _reindex(self) -> None:
+        """Sort every row into the indexes, dropping dead rows if it's time to."""
+        rows = len(self._alive)
+        if rows - self._live > max(_MIN_DEAD, self._live):
+            keep = [row for row in range(rows) if self._alive[row]]
+            self._columns = tuple(
+                array("q", (values[row] for row in keep)) for values in self._columns
+            )
+            self._alive = bytearray(b"\x01") * len(keep)
+            rows = len(keep)
+        self._indexes = tuple(
+            array("q", sorted(range(rows), key=values.__getitem__))
+            for values in self._columns
+        )
+        offsets = []
+        for values in self._columns:
+            counts = [0] * (len(self._terms) + 1)
+            for term_id in values:
+                counts[term_id + 1] += 1
+            offsets.append(array("q", accumulate(counts)))
+        self._offsets = tuple(offsets)
+        self._indexed = rows
+        self._tail = ({}, {}, {})
+
+    def load(self, triples: Iterable[Triple]) -> None:
+        """
+        Add triples in bulk, sorting them into the indexes once at the end rather
+        than as they arrive. Unlike add, this doesn't dispatch a TripleAddedEvent
+        for each one.
+        """
+        seen = {
+            term_ids
+            for term_ids, alive in zip(zip(*self._columns), self._alive)
+            if alive
+        }
+        intern = self._intern
+        s, p, o = self._columns
+        for triple in triples:
+            term_ids = tuple(intern(term) for term in triple)
+            if term_ids in seen:
+                continue
+            seen.add(term_ids)
+            s.append(term_ids[0])
+            p.append(term_ids[1])
+            o.append(term_ids[2])
+        added = len(s) - len(self._alive)
+        self._alive.extend(b"\x01" * added)
+        self._live += added
+        self._reindex()
+
+    def add(self, triple: Triple, context, quoted: bool = False) -> None:
+        Store.add(self, triple, context, quoted)
+        term_ids = [self._intern(term) for term in triple]
+        if any(True for _ in self._matching_rows(triple)):
+            return
+
+        row = len(self._alive)
+        for column, values in enumerate(self._columns):
+            values.append(term_ids[column])
+            self._tail[column].setdefault(term_ids[column], []).append(row)
+        self._alive.append(1)
+        self._live += 1
+        if row + 1 - self._indexed > max(_MIN_TAIL, self._indexed // 4):
+            self._reindex()
+
+    def remove(self, triple_pattern, context=None) -> None:
+        for row in list(self._matching_rows(triple_pattern)):
+            Store.remove(self, self._triple(row), context)
+            self._alive[row] = 0
+            self._live -= 1
+
+    def _triple(self, row: int) -> Triple:
+        s, p, o = self._columns
+        return self._terms[s[row]], self._terms[p[row]], self._terms[o[row]]
+
+    def triples(self, triple_pattern, context=None):
+        # The rows that match now, and the columns they are rows of: the store
+        # may be changed while the caller goes through them, and compacting
+        # swaps in new columns (rather than changing these) and renumbers rows.
+        rows = list(self._matching_rows(triple_pattern))
+        s, p, o = self._columns
+        terms = self._terms
+        for row in rows:
+            yield (terms[s[row]], terms[p[row]], terms[o[row]]), iter(())
+
+    def __len__(self, context=None) -> int:
+        return self._live
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    def bind(self, prefix: str, namespace: URIRef, override: bool = True) -> None:
+        bound_namespace = self._namespace.get(prefix)
+        bound_prefix = self._prefix.get(namespace)
+        if bound_prefix is None and bound_namespace is not None:
+            bound_prefix = self._prefix.get(bound_namespace)
+        if override:
+            if bound_prefix is not None:
+                del self._namespace[bound_prefix]
+            if bound_namespace is not None:
+                del self._prefix[bound_namespace]
+            self._prefix[namespace] = prefix
+            self._namespace[prefix] = namespace
+        else:
+            namespace = bound_namespace if bound_namespace is not None else namespace
+            prefix = bound_prefix if bound_prefix is not None else prefix
+            self._prefix[namespace] = prefix
+            self._namespace[prefix] = namespace
+
+    def namespace(self, prefix: str) -> URIRef | None:
+        return self._namespace.get(prefix)
+
+    def prefix(self, namespace: URIRef) -> str | None:
+        return self._prefix.get(namespace)
+
+    def namespaces(self) -> Iterator[tuple[str, URIRef]]:
+        yield from self._namespace.items()
+
+
+def compact_graph(triples: Graph | Iterable[Triple]) -> Graph:
+    """
+    A new Graph held in an ArrayStore, with the supplied triples and, when they
+    come from a Graph, its namespace bindings.
+    """
+    store = ArrayStore()
+    graph = Graph(store=store)
+    if isinstance(triples, Graph):
+        for prefix, namespace in triples.namespaces():
+            graph.bind(prefix, namespace, override=True, replace=True)
+    store.load(triples)
+    return graph
+
+
+def memory_graph(graph: Graph) -> Graph:
+    """A copy of graph in rdflib's default (Memory) store, namespaces and all."""
+    copy = Graph()
+    for prefix, namespace in graph.namespaces():
+        copy.bind(prefix, namespace, override=True, replace=True)
+    for triple in graph:
+        copy.add(triple)
+    return copy
@@ -1,14 +1,20 @@
 import json
+import logging
+import pstats
 import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
 import pytest
 from rdflib import RDFS, BNode, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
 from sqlalchemy.orm import sessionmaker
 
 from bluecore_models import bluecore_graph
 from bluecore_models.bluecore_graph import (
     BluecoreGraph,
     DuplicateValueError,
+    SlowSave,
     save_graph,
 )
 from bluecore_models.models import (
@@ -16,10 +22,19 @@ from bluecore_models.models import (
     Hub,
     Instance,
     OtherResource,
+    ResourceSource,
     Work,
 )
-from bluecore_models.namespaces import BF, MADS, RDF
-from bluecore_models.utils.graph import CONTEXT, load_jsonld
+from bluecore_models.namespaces import BF, BFLC, MADS, RDF
+from bluecore_models.utils import metrics
+from bluecore_models.utils.graph import (
+    CONTEXT,
+    generate_entity_graph,
+    get_bf_classes,
+    load_jsonld,
+)
+from bluecore_models.utils.sql_profile import StatementProfiler
+from bluecore_models.utils.store import ArrayStore, memory_graph
 
 
 def _derived_from_ids(data: dict) -> list[str]:
@@ -69,6 +84,74 @@ def test_bluecore_graph():
             )
 
 
+def test_subject_index_follows_revision():
+    """
+    The subject index used to find Other Resources is rebuilt once the graph
+    has been mutated, so a subject added since is seen.
+    """
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    bg = BluecoreGraph(g)
+
+    subjects = bg._subjects()
+    assert subjects == set(g.subjects())
+    assert bg._subjects() is subjects, "reused while the graph is unchanged"
+
+    new_subject = URIRef("http://example.com/new-subject")
+    g.add((new_subject, RDFS.label, Literal("new")))
+    bg._bump_revision()
+
+    assert new_subject in bg._subjects()
+
+
+def test_partition_matches_entity_graphs():
+    """
+    The single-pass partition gives each resource the same subgraph
+    generate_entity_graph extracts for it on its own.
+    """
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    bg = BluecoreGraph(g)
+
+    partition = bg._partition()
+    assert len(partition.works) == 2
+    assert len(partition.instances) == 2
+    assert len(partition.others) == 32
+    for class_, graphs in [
+        (BF.Work, partition.works),
+        (BF.Instance, partition.instances),
+        (None, partition.others),
+    ]:
+        for entity_graph in graphs:
+            subject = bg._subject(entity_graph, class_)
+            expected = generate_entity_graph(g, subject)
+            assert set(entity_graph) == set(expected)
+
+
+def test_switch_uris_patches_subgraphs(monkeypatch):
+    """
+    Switching uris patches the cached subgraphs in place of partitioning the
+    graph again, and ends up with what partitioning it again would give.
+    """
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    bg = BluecoreGraph(g)
+
+    works = bg.works()
+    renames = {bg._subject(w, BF.Work): bg._mint_uri(BF.Work) for w in works}
+    with monkeypatch.context() as m:
+        m.setattr(bluecore_graph, "group_statements", None)
+        bg._switch_uris(renames)
+        patched = [bg.hubs(), bg.works(), bg.instances(), bg.others()]
+
+    assert bg._subjects() == set(g.subjects())
+    for graphs, expected in zip(patched, bg._partition()):
+        assert {v.subject: set(v) for v in graphs} == {
+            v.subject: set(v) for v in expected
+        }
+    assert {w.subject for w in bg.works()} == set(renames.values())
+
+
 def test_remove_oclc_number_identifiers():
     """
     bf:identifiedBy blank nodes typed bf:OclcNumber are stripped out, while
@@ -90,7 +173,7 @@ def test_remove_oclc_number_identifiers():
     bg = BluecoreGraph(g)
     instances = bg.instances()
     assert len(instances) == 1
-    instance_graph = instances[0]
+    instance_graph = instances[0].to_graph()
 
     bg._remove_triples_by_type(instance_graph, BF.identifiedBy, BF.OclcNumber)
 
@@ -241,6 +324,65 @@ def test_non_bluecore_work(pg_session, monkeypatch, mocker):
     assert uuid_spy.call_count == 1
 
 
+def test_time_minting(pg_session):
+    """
+    With minting="time" minted URIs end in a uuid7, so they sort in the order
+    they were minted.
+    """
+    graph = Graph()
+    for i in range(3):
+        graph.add((URIRef(f"https://example.com/timed/{i}"), RDF.type, BF.Work))
+    saved = save_graph(pg_session, graph, minting="time")
+
+    minted = sorted(s for s in saved.subjects(RDF.type, BF.Work))
+    assert len(minted) == 3
+    assert {uuid.UUID(str(uri).split("/")[-1]).version for uri in minted} == {7}
+    with pg_session() as session:
+        works = session.query(Work).where(Work.uri.in_(minted)).order_by(Work.id)
+        assert [URIRef(work.uri) for work in works] == minted
+
+
+def test_name_minting(pg_session, mocker):
+    """
+    With minting="name" a resource with an external URI is minted the same
+    Bluecore URI by every save, while one saved before with a random URI is
+    still found under its derivedFrom.
+    """
+    work = URIRef("https://example.com/name-minted")
+    expected = uuid.uuid5(
+        uuid.NAMESPACE_URL, "https://bcld.info/works/https://example.com/name-minted"
+    )
+    bg = BluecoreGraph(Graph(), minting="name")
+    assert bg._mint_uri(BF.Work, work) == URIRef(f"https://bcld.info/works/{expected}")
+    assert bg._mint_uri(BF.Work, work) == BluecoreGraph(
+        Graph(), minting="name"
+    )._mint_uri(BF.Work, work)
+    assert bg._mint_uri(BF.Instance, work) != bg._mint_uri(BF.Work, work)
+    assert bg._mint_uri(BF.Work, BNode()) != bg._mint_uri(BF.Work, BNode())
+
+    with pytest.raises(bluecore_graph.BluecoreGraphError):
+        BluecoreGraph(Graph(), minting="sequential")
+
+    jsonld_object = {
+        "@context": CONTEXT,
+        "@id": str(work),
+        "@type": BF.Work,
+        "title": {"mainTitle": "Gravity's Rainbow", "@type": "Title"},
+    }
+    saved = save_graph(pg_session, load_jsonld(jsonld_object), minting="name")
+    assert URIRef(f"https://bcld.info/works/{expected}") in set(saved.subjects())
+
+    jsonld_object["@id"] = "https://example.com/random-minted"
+    uuid_spy = mocker.spy(bluecore_graph, "uuid4")
+    first = save_graph(pg_session, load_jsonld(jsonld_object))
+    assert uuid_spy.call_count == 1
+    again = save_graph(pg_session, load_jsonld(jsonld_object), minting="name")
+    assert uuid_spy.call_count == 1
+    assert {s for s in again.subjects() if isinstance(s, URIRef)} == {
+        s for s in first.subjects() if isinstance(s, URIRef)
+    }
+
+
 @pytest.mark.parametrize(
     "bf_class, sqla_class, collection",
     [
@@ -986,8 +1128,8 @@ def test_a_hubs_authorities_become_other_resources(pg_session):
     """
     A Hub's referenced authorities have to be harvested like a Work's are.
 
-    _extract_others once walked only Works and Instances, so a place named by a
-    Hub's originPlace was never stored and the Hub's page showed the bare
+    Other Resource discovery once walked only Works and Instances, so a place
+    named by a Hub's originPlace was never stored and the Hub's page showed the bare
     identifier "n80126293" where LC shows "New York (State)".
     """
     place = "http://id.loc.gov/rwo/agents/n80126293"
@@ -1092,6 +1234,37 @@ def test_admin_metadata(pg_session):
         assert derived_from <= original_instance_uris
 
 
+def test_admin_metadata_stamped_once_per_save(pg_session):
+    """
+    Every resource a save mints gets the same date and cataloger id, and
+    regenerating their adminMetadata leaves that of other resources alone.
+    """
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    agent = URIRef("http://id.loc.gov/rwo/agents/n2024040886")
+    agent_admin_metadata = BNode()
+    g.add((agent, BF.adminMetadata, agent_admin_metadata))
+    g.add((agent_admin_metadata, RDF.type, BF.AdminMetadata))
+
+    updated_graph = save_graph(pg_session, g)
+
+    minted = [
+        s
+        for class_ in (BF.Work, BF.Instance)
+        for s in updated_graph.subjects(RDF.type, class_)
+    ]
+    assert len(minted) == 4
+    dates = set()
+    cataloger_ids = set()
+    for s in minted:
+        for node in updated_graph.objects(s, BF.adminMetadata):
+            dates.update(updated_graph.objects(node, BF.date))
+            cataloger_ids.update(updated_graph.objects(node, BFLC.catalogerId))
+    assert len(dates) == 2, "one dateTime and one date for the whole save"
+    assert cataloger_ids == {Literal("Unknown")}
+    assert set(updated_graph.objects(agent, BF.adminMetadata)) == {agent_admin_metadata}
+
+
 def _remove_fixtures(pg_session):
     with pg_session() as session:
         session.query(Instance).delete()
@@ -1454,7 +1627,7 @@ def test_stub_is_marked_incomplete(pg_session):
 
 def test_stub_status_resolves_as_an_other_resource(pg_session):
     """
-    Nothing in an incoming record describes mstatus/incmp, and _extract_others
+    Nothing in an incoming record describes mstatus/incmp, and _partition
     only promotes uris that appear as subjects, so we describe it ourselves --
     otherwise the marker would be an unresolvable uri with nothing to display.
     """
@@ -1749,3 +1922,393 @@ def test_save_allows_distinct_titles(pg_session):
         saved = session.query(Work).one()
         titles = list(load_jsonld(saved.data).objects(URIRef(saved.uri), BF.title))
         assert len(titles) == 3
+
+
+def test_save_with_executor(pg_session):
+    """
+    An executor frames the resources of a save in other processes, giving the
+    same JSON-LD in the same order as framing them here.
+    """
+    _remove_fixtures(pg_session)
+
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    bg = BluecoreGraph(g)
+    resources = [
+        (bg._subject(view, view.kind), view)
+        for view in bg.hubs() + bg.works() + bg.instances() + bg.others()
+    ]
+    serial = bg._frame_all(resources)
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        bg._executor = executor
+        assert bg._frame_all(resources) == serial
+
+        g = Graph()
+        g.parse("tests/data/23807141.ttl")
+        save_graph(pg_session, g, executor=executor)
+
+    with pg_session() as session:
+        assert len(session.query(Work).all()) == 2
+        assert len(session.query(Instance).all()) == 2
+        assert len(session.query(OtherResource).all()) == 28
+        for work in session.query(Work):
+            assert work.data["@id"] == work.uri
+
+
+def test_save_compact(pg_session):
+    """
+    A compact save works on an ArrayStore copy of the graph, saving what the
+    graph itself would save and leaving the graph alone.
+    """
+    _remove_fixtures(pg_session)
+
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    before = set(g)
+    saved = save_graph(pg_session, g, compact=True)
+
+    assert isinstance(saved.store, ArrayStore)
+    assert set(g) == before
+    assert len(list(saved.subjects(BF.derivedFrom, None))) == 4
+
+    with pg_session() as session:
+        works = session.query(Work).order_by(Work.id).all()
+        assert len(works) == 2
+        assert sorted(len(w.other_resources) for w in works) == [6, 20]
+        assert len(session.query(Instance).all()) == 2
+        assert len(session.query(OtherResource).all()) == 28
+
+
+def test_save_report(pg_session):
+    """
+    save() reports what it wrote and how long each phase took; a second save
+    of the same graph finds everything already there.
+    """
+    _remove_fixtures(pg_session)
+
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    bg = BluecoreGraph(g)
+    report = bg.save(pg_session)
+
+    assert report is bg.report
+    assert report.triples == len(bg.graph)
+    assert report.attempts == 1 and report.errors == []
+    assert list(report.phases) == [
+        "check_duplicates",
+        "strip",
+        "mint",
+        "plan",
+        "persist",
+        "frame",
+        "flush",
+        "claim",
+        "link",
+        "commit",
+    ]
+    assert all(phase.wall >= 0 and phase.cpu >= 0 for phase in report.phases.values())
+    assert sum(phase.wall for phase in report.phases.values()) <= report.wall
+    assert (report.inserted, report.updated, report.unchanged, report.kept) == (
+        32,
+        0,
+        0,
+        0,
+    )
+    assert report.links == 43
+
+    reports = []
+    save_graph(pg_session, bg.graph, on_report=reports.append)
+    assert len(reports) == 1
+    assert reports[0].inserted == 0
+    assert reports[0].updated + reports[0].unchanged + reports[0].kept == 32
+    assert reports[0].unchanged > 0
+
+
+def test_bulk_save(pg_session):
+    """
+    A bulk save writes each kind of resource with one statement, and records
+    the same Versions, Bibframe classes and sources as the ORM would.
+    """
+    _remove_fixtures(pg_session)
+
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    with StatementProfiler(pg_session.kw["bind"]):
+        report = BluecoreGraph(g).save(pg_session, bulk=True)
+
+    assert (report.inserted, report.updated, report.unchanged, report.kept) == (
+        32,
+        0,
+        0,
+        0,
+    )
+    assert report.links == 43
+    inserts = [
+        stats.calls
+        for shape, stats in report.statements.statements.items()
+        if shape.startswith("INSERT INTO resource_base ")
+    ]
+    assert sum(inserts) == 3, "one each for Works, Instances and Other Resources"
+
+    with pg_session() as session:
+        works = session.query(Work).all()
+        instances = session.query(Instance).all()
+        assert len(works) == 2 and len(instances) == 2
+        assert all(instance.work in works for instance in instances)
+        for resource in works + instances:
+            assert resource.versions
+            assert all(version.data == resource.data for version in resource.versions)
+            assert {c.bf_class.uri for c in resource.classes} == {
+                str(bf_class)
+                for bf_class in get_bf_classes(resource.data, resource.uri)
+            }
+            assert {
+                source.source_uri
+                for source in session.query(ResourceSource).where(
+                    ResourceSource.resource_id == resource.id
+                )
+            } == set(_derived_from_ids(resource.data))
+        # the Work the record describes, rather than one it only mentions
+        work = instances[0].work
+        work_uri = URIRef(work.uri)
+        assert len(work.versions) == 1
+
+    g.add((work_uri, BF.note, Literal("bulk loaded")))
+    report = BluecoreGraph(g).save(pg_session, primary_class=BF.Work, bulk=True)
+    assert report.inserted == 0
+    assert report.resources["works"]["updated"] >= 1
+    with pg_session() as session:
+        work = session.query(Work).where(Work.uri == str(work_uri)).one()
+        assert len(work.versions) == 2
+        assert "bulk loaded" in json.dumps(work.data)
+
+
+def test_resave_only_writes_changed_links(pg_session):
+    """
+    Saving a record again leaves the links it already has as they are, and
+    only deletes the ones it no longer makes.
+    """
+    _remove_fixtures(pg_session)
+
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    BluecoreGraph(g).save(pg_session, primary_class=BF.Work)
+
+    def stored_links():
+        with pg_session() as session:
+            return {
+                (link.bibframe_resource.uri, link.other_resource.uri): link.id
+                for link in session.query(BibframeOtherResources)
+            }
+
+    links = stored_links()
+    with StatementProfiler(pg_session.kw["bind"]):
+        report = BluecoreGraph(g).save(pg_session, primary_class=BF.Work)
+    assert not [
+        shape
+        for shape in report.statements.statements
+        if shape.startswith(
+            (
+                "INSERT INTO bibframe_other_resources",
+                "DELETE FROM bibframe_other_resources",
+            )
+        )
+    ]
+    assert stored_links() == links
+    with pg_session() as session:
+        assert all(instance.work for instance in session.query(Instance))
+
+    # the record stops mentioning one of its Other Resources
+    bibframe_uri, other_uri = next(
+        (URIRef(bibframe_uri), URIRef(other_uri))
+        for bibframe_uri, other_uri in sorted(links)
+        if (URIRef(bibframe_uri), None, URIRef(other_uri)) in g
+    )
+    g.remove((bibframe_uri, None, other_uri))
+    BluecoreGraph(g).save(pg_session, primary_class=BF.Work)
+    links.pop((str(bibframe_uri), str(other_uri)))
+    assert stored_links() == links
+
+
+def test_save_metrics(pg_session, monkeypatch):
+    """
+    A save reports into the installed metrics registry, and the ORM hooks do
+    too as resources are flushed.
+    """
+    _remove_fixtures(pg_session)
+    registry = metrics.Registry()
+    monkeypatch.setattr(metrics, "_registry", registry)
+
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    report = BluecoreGraph(g).save(pg_session)
+
+    saves = registry.counter("bluecore_saves_total", "", ["outcome"])
+    assert saves.value(outcome="committed") == 1
+    resources = registry.counter(
+        "bluecore_save_resources_total", "", ["kind", "outcome"]
+    )
+    assert resources.value(kind="works", outcome="inserted") == 2
+    assert resources.value(kind="other_resources", outcome="inserted") == 28
+    phases = registry.histogram("bluecore_save_phase_duration_seconds", "", ["phase"])
+    assert all(phases.count(phase=phase) == 1 for phase in report.phases)
+    versions = registry.counter("bluecore_versions_total", "", ["kind", "outcome"])
+    assert versions.value(kind="works", outcome="written") == 2
+
+    text = registry.render()
+    assert 'bluecore_saves_total{outcome="committed"} 1.0' in text
+    assert "# TYPE bluecore_save_duration_seconds histogram" in text
+
+
+def test_failed_save_metrics(pg_session, monkeypatch):
+    """
+    A save that raises is counted as failed, whatever it raised.
+    """
+    registry = metrics.Registry()
+    monkeypatch.setattr(metrics, "_registry", registry)
+
+    work = URIRef("https://bcld.info/works/" + str(uuid.uuid4()))
+    graph = Graph()
+    for _ in range(2):
+        title = BNode()
+        graph.add((work, BF.title, title))
+        graph.add((title, BF.mainTitle, Literal("Pride and prejudice")))
+    with pytest.raises(DuplicateValueError):
+        save_graph(pg_session, graph)
+
+    def fail(self, plan, session):
+        raise ValueError("not a retryable error")
+
+    monkeypatch.setattr(BluecoreGraph, "_link", fail)
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    with pytest.raises(ValueError):
+        save_graph(pg_session, g)
+
+    saves = registry.counter("bluecore_saves_total", "", ["outcome"])
+    assert saves.value(outcome="failed") == 2
+    assert saves.value(outcome="committed") == 0
+
+
+def test_save_report_statements(pg_session):
+    """
+    With a StatementProfiler listening, a save's report has the statements it ran.
+    """
+    _remove_fixtures(pg_session)
+
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    with StatementProfiler(pg_session.kw["bind"]) as profiler:
+        report = BluecoreGraph(g).save(pg_session)
+
+    assert report.statements.calls > 0
+    assert report.statements.calls <= profiler.profile.calls
+    assert any(
+        "resource_base.uri IN (...)" in shape for shape in report.statements.statements
+    )
+    assert BluecoreGraph(g).save(pg_session).statements.calls == 0
+
+
+def test_slow_save(pg_session, tmp_path, caplog):
+    """
+    A save slower than its threshold is logged, with its input and profile kept
+    for replaying; one that isn't leaves nothing behind.
+    """
+    _remove_fixtures(pg_session)
+
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    BluecoreGraph(g, source="fast.ttl").save(
+        pg_session, slow=SlowSave(3600, tmp_path, profile=True)
+    )
+    assert list(tmp_path.iterdir()) == []
+    assert "slow graph save" not in caplog.text
+
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    passed = memory_graph(g)
+    with caplog.at_level(logging.WARNING):
+        save_graph(
+            pg_session,
+            g,
+            source="23807141.ttl",
+            slow=SlowSave(0, tmp_path / "slow", profile=True),
+        )
+
+    (record,) = [r.slow_save for r in caplog.records if hasattr(r, "slow_save")]
+    assert record["source"] == "23807141.ttl"
+    assert record["primary_class"] is None
+    assert record["update_other_resources"] is True
+    assert record["triples"] == len(g)
+    assert "commit" in record["phases"]
+    assert json.loads(caplog.records[-1].getMessage().split(": ", 1)[1]) == record
+
+    pstats.Stats(record["profile"])
+    replay = Graph()
+    replay.parse(record["graph"])
+    # the graph as it was passed in, without what BluecoreGraph inferred
+    assert isomorphic(replay, passed)
+    save_graph(pg_session, replay)
+
+
+def test_failed_slow_save(pg_session, tmp_path, caplog, monkeypatch):
+    """
+    A slow save that fails is logged and kept as well, with its error, before
+    the error is raised.
+    """
+    _remove_fixtures(pg_session)
+
+    def fail(self, plan, session):
+        raise ValueError("not a retryable error")
+
+    monkeypatch.setattr(BluecoreGraph, "_link", fail)
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    with caplog.at_level(logging.WARNING), pytest.raises(ValueError):
+        save_graph(
+            pg_session,
+            g,
+            primary_class=BF.Work,
+            slow=SlowSave(0, tmp_path),
+        )
+
+    (record,) = [r.slow_save for r in caplog.records if hasattr(r, "slow_save")]
+    assert record["error"] == "ValueError: not a retryable error"
+    assert record["primary_class"] == "Work"
+    assert record["attempts"] == 1
+    assert "persist" in record["phases"]
+    assert Path(record["graph"]).exists()
+
+
+def test_derived_from_lookup_is_one_query(pg_session):
+    """
+    Saving a record again finds its resources by their derivedFrom URIs with a
+    single query, however many there are, and reuses their Bluecore URIs.
+    """
+    _remove_fixtures(pg_session)
+
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    first = save_graph(pg_session, g)
+    minted = {s for s in first.subjects() if str(s).startswith("https://bcld.info/")}
+    assert len(minted) == 4
+
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    with StatementProfiler(pg_session.kw["bind"]):
+        bg = BluecoreGraph(g)
+        report = bg.save(pg_session)
+
+    lookups = [
+        stats.calls
+        for shape, stats in report.statements.statements.items()
+        if shape.startswith("SELECT") and "FROM resource_sources" in shape
+    ]
+    assert lookups == [1]
+    assert {
+        s for s in bg.graph.subjects() if str(s).startswith("https://bcld.info/")
+    } == minted
+    with pg_session() as session:
+        assert session.query(Work).count() == 2
+        assert session.query(Instance).count() == 2
@@ -1,5 +1,8 @@
 import json
+import os
 import pathlib
+import subprocess
+import sys
 from datetime import UTC, datetime
 from pathlib import Path
 from uuid import UUID, uuid1
@@ -16,6 +19,7 @@ from bluecore_models.models import (
     OtherResource,
     Profile,
     ResourceBibframeClass,
+    ResourceSource,
     Version,
     Work,
 )
@@ -352,6 +356,65 @@ def test_updated_hub(pg_session):
         assert latest_version.created_at == hub.updated_at
 
 
+def test_resource_sources(pg_session):
+    def data(uri, *sources):
+        return {
+            "@id": uri,
+            "adminMetadata": [
+                {"@type": "AdminMetadata"},
+                {"derivedFrom": [{"@id": source} for source in sources]},
+            ],
+        }
+
+    def sources(session):
+        return {
+            (source.source_uri, source.resource_id)
+            for source in session.query(ResourceSource).where(
+                ResourceSource.source_uri.like("https://example.com/sourced/%")
+            )
+        }
+
+    with pg_session() as session:
+        work = Work(
+            uri="https://bcld.info/works/sourced",
+            data=data(
+                "https://bcld.info/works/sourced",
+                "https://example.com/sourced/1",
+                "https://example.com/sourced/2",
+            ),
+        )
+        session.add(work)
+        session.commit()
+        assert sources(session) == {
+            ("https://example.com/sourced/1", work.id),
+            ("https://example.com/sourced/2", work.id),
+        }
+
+        # a source already taken by a Work stays with it
+        other = Work(
+            uri="https://bcld.info/works/sourced-again",
+            data=data(
+                "https://bcld.info/works/sourced-again",
+                "https://example.com/sourced/2",
+                "https://example.com/sourced/3",
+            ),
+        )
+        session.add(other)
+        session.commit()
+        assert ("https://example.com/sourced/2", work.id) in sources(session)
+        assert ("https://example.com/sourced/3", other.id) in sources(session)
+
+        work.data = data(
+            work.uri, "https://example.com/sourced/1", "https://example.com/sourced/4"
+        )
+        session.add(work)
+        session.commit()
+        assert {source for source in sources(session) if source[1] == work.id} == {
+            ("https://example.com/sourced/1", work.id),
+            ("https://example.com/sourced/4", work.id),
+        }
+
+
 def test_hub_work_relationship(pg_session):
     with pg_session() as session:
         hub = session.query(Hub).where(Hub.id == 4).first()
@@ -559,3 +622,21 @@ def test_work_with_non_standard_namespaces(pg_session):
         assert len(work.classes) == 0
         # I expected to see at least one classes but maybe this is because the
         # test data doesn't have all the necessary parts?
+
+
+def test_models_import_without_rdf_machinery():
+    """
+    Importing the models doesn't import rdflib or pyld, which every process
+    touching the database would otherwise pay for. They are imported when
+    resource data is first set. See benchmarks/import_time_bench.py.
+    """
+    code = (
+        "import sys\n"
+        "from bluecore_models.models import Work\n"
+        "assert 'rdflib' not in sys.modules and 'pyld' not in sys.modules\n"
+        "Work(uri='https://bcld.info/works/1', data={'@id': 'https://bcld.info/works/1'})\n"
+        "assert 'pyld' in sys.modules\n"
+    )
+    # the same import path as this process, which pytest may have added to
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
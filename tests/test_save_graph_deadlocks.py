@@ -6,6 +6,7 @@ from rdflib import Graph
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
+from bluecore_models import bluecore_graph
 from bluecore_models.bluecore_graph import BluecoreGraph, save_graph
 from bluecore_models.models import BibframeOtherResources, Instance, OtherResource, Work
 from bluecore_models.namespaces import BF
@@ -119,6 +120,93 @@ def test_save_retries_on_deadlock(pg_session):
         assert session.query(Work).count() == 2, "Works persisted after retry"
 
 
+def test_save_retry_reuses_plan(pg_session, mocker):
+    """
+    A retry re-runs only the database work: URIs are minted and resources
+    framed once, however many attempts the save takes.
+    """
+    _remove_fixtures(pg_session)
+
+    mint = mocker.spy(BluecoreGraph, "_mint_all_uris")
+    frame = mocker.patch(
+        "bluecore_models.bluecore_graph.frame_graph",
+        side_effect=bluecore_graph.frame_graph,
+    )
+    flaky = _FlakySessionMaker(pg_session, fail_times=2)
+
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    BluecoreGraph(g).save(flaky)
+
+    assert flaky.calls == 3
+    assert mint.call_count == 3, "once per minted class, not per attempt"
+    framed = [call.args[0] for call in frame.call_args_list]
+    assert len(framed) == len(set(framed)), "each resource is framed once"
+
+    with pg_session() as session:
+        assert session.query(Work).count() == 2
+        assert session.query(Instance).count() == 2
+        assert session.query(BibframeOtherResources).count() > 0, "linked on retry"
+
+
+def test_save_adopts_resources_minted_by_concurrent_save(pg_session, mocker):
+    """
+    Two saves of the same record that both look its resources up before either
+    commits both mint them. The later one finds the sources claimed when it
+    inserts its resources, and tries again with the first one's URIs instead
+    of leaving a second copy of each resource.
+    """
+    _remove_fixtures(pg_session)
+
+    first = Graph()
+    first.parse("tests/data/23807141.ttl")
+    first = save_graph(pg_session, first)
+
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    bg = BluecoreGraph(g)
+    # as though the lookup ran before the first save committed
+    mocker.patch.object(bg, "_find_derived", return_value={})
+    report = bg.save(pg_session)
+
+    assert report.attempts == 2
+    assert report.errors == ["SourceConflictError"]
+
+    def bluecore(graph):
+        return {s for s in graph.subjects() if str(s).startswith("https://bcld.info/")}
+
+    assert bluecore(bg.graph) == bluecore(first)
+    with pg_session() as session:
+        assert session.query(Work).count() == 2
+        assert session.query(Instance).count() == 2
+
+
+def test_name_minted_concurrent_saves_agree(pg_session, mocker):
+    """
+    With minting="name" two saves of the same record that both miss it in
+    the database mint the same URIs, so the later one just updates what the
+    first one inserted.
+    """
+    _remove_fixtures(pg_session)
+
+    first = Graph()
+    first.parse("tests/data/23807141.ttl")
+    first = save_graph(pg_session, first, minting="name")
+
+    g = Graph()
+    g.parse("tests/data/23807141.ttl")
+    bg = BluecoreGraph(g, minting="name")
+    mocker.patch.object(bg, "_find_derived", return_value={})
+    bg.save(pg_session)
+
+    assert set(bg.graph.subjects()) & set(first.subjects()) >= {
+        s for s in first.subjects() if str(s).startswith("https://bcld.info/")
+    }
+    with pg_session() as session:
+        assert session.query(Work).count() == 2
+        assert session.query(Instance).count() == 2
+
+
 # ---------------------------------------------------------------------------
 # Atomic upsert instead of SELECT-then-INSERT (get-or-create race)
 # ---------------------------------------------------------------------------
@@ -211,6 +299,44 @@ def test_concurrent_first_time_create_of_same_uri(pg_session):
             )
 
 
+def test_bulk_concurrent_first_time_create_of_same_uri(pg_session):
+    """
+    Bulk saves insert a new shared Other Resource with INSERT ... ON CONFLICT,
+    so concurrent writers wait on each other instead of failing with a
+    UniqueViolation and starting over.
+    """
+    _remove_fixtures(pg_session)
+
+    writers = 5
+    other_uri = f"{SHARED_OTHER_URI}/bulk"
+    barrier = threading.Barrier(writers)
+    reports: list = []
+    failures: list[str] = []
+
+    def writer(idx: int) -> None:
+        work_uuid = f"99{idx:02d}0000-0000-0000-0000-000000000000"
+        graph = _work_referencing_shared_other(work_uuid, other_uri)
+        barrier.wait()
+        try:
+            save_graph(pg_session, graph, bulk=True, on_report=reports.append)
+        except Exception as exc:  # noqa: BLE001
+            failures.append(type(exc).__name__)
+
+    threads = [threading.Thread(target=writer, args=(idx,)) for idx in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert failures == []
+    assert [report.errors for report in reports] == [[]] * writers
+    with pg_session() as session:
+        assert (
+            session.query(OtherResource).where(OtherResource.uri == other_uri).count()
+            == 1
+        )
+
+
 # ---------------------------------------------------------------------------
 # Acceptance: concurrent writers sharing authorities complete without deadlock
 # ---------------------------------------------------------------------------
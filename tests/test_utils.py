@@ -1,20 +1,38 @@
 import json
+import random
+import socket
+import sys
+import time
 from pathlib import Path
 
+import pytest
 import rdflib
+from pyld import context_resolver
+from pyld.jsonld import JsonLdError
 from rdflib import DCTERMS, RDF, BNode, Literal, URIRef
+from rdflib.compare import isomorphic
 
+from bluecore_models.utils import graph as graph_utils
+from bluecore_models.utils import metrics, sql_profile, store, uuids
 from bluecore_models.utils.graph import (
     BF,
     BFLC,
+    CONTEXT,
     MADS,
+    DocumentLoader,
+    EntityView,
+    FramedJsonLD,
     _expand_bnode,
     find_duplicate_bnode_values,
+    frame_graph,
+    frame_jsonld,
     generate_entity_graph,
     init_graph,
     load_jsonld,
     replace_uri,
+    replace_uris,
 )
+from bluecore_models.utils.store import ArrayStore, compact_graph, memory_graph
 
 
 def test_init_graph():
@@ -57,6 +75,37 @@ def test_generate_entity_graph():
     assert work_dcterm_part_of is None
 
 
+def test_entity_view():
+    """
+    An EntityView answers lookups and serializes like the rdflib Graph it stands
+    in for, without being one.
+    """
+    with Path("tests/data/23807141.jsonld").open() as fo:
+        loc_graph = load_jsonld(json.load(fo))
+
+    work_uri = URIRef("http://id.loc.gov/resources/works/23807141")
+    work_graph = generate_entity_graph(loc_graph, work_uri)
+    view = EntityView(loc_graph, work_uri, BF.Work, work_graph)
+
+    assert len(view) == len(work_graph) == 118
+    assert (work_uri, RDF.type, BF.Work) in view
+    assert (work_uri, rdflib.DCTERMS.isPartOf, None) not in view
+    assert set(view.objects(work_uri, BF.title)) == set(
+        work_graph.objects(work_uri, BF.title)
+    )
+    main_titles = [
+        str(view.value(title, BF.mainTitle))
+        for title in view.objects(work_uri, BF.title)
+    ]
+    assert any(t.startswith("HBR guide") for t in main_titles)
+    title = view.value(subject=work_uri, predicate=BF.title)
+    assert list(view.subjects(BF.title, title)) == [work_uri]
+
+    serialized = json.loads(view.serialize(format="json-ld"))
+    assert isomorphic(load_jsonld(serialized), work_graph)
+    assert isomorphic(view.to_graph(), work_graph)
+
+
 # LC serializations routinely describe the same resource more than once in a
 # single document: the Instance appears standalone, and again nested inside the
 # Work's bf:hasInstance. The nested copy is abbreviated -- it repeats the title
@@ -169,6 +218,51 @@ def test_find_duplicate_bnode_values_ignores_distinct_values():
     assert len(list(graph.objects(work, BF.title))) == 4
 
 
+def test_find_duplicate_bnode_values_shared_and_cyclic_subtrees():
+    """
+    A subtree shared by many values is fingerprinted once rather than once per
+    path to it, and a cycle still gives the same answer from wherever it is
+    entered.
+    """
+    graph = init_graph()
+    work = URIRef("http://example.com/work")
+
+    # a chain where each node points at the next one twice over: 2**40 paths
+    # to the bottom without memoizing
+    node = BNode()
+    graph.add((node, RDF.value, Literal("bottom")))
+    for _ in range(40):
+        parent = BNode()
+        graph.add((parent, BF.part, node))
+        graph.add((parent, BF.note, node))
+        node = parent
+    first, second = BNode(), BNode()
+    for value in (first, second):
+        graph.add((work, BF.title, value))
+        graph.add((value, BF.part, node))
+
+    # two identical loops, and one entered at a different point
+    loops = []
+    for label in ("a", "a", "b"):
+        head, tail = BNode(), BNode()
+        graph.add((head, BF.part, tail))
+        graph.add((tail, BF.part, head))
+        graph.add((head, RDF.value, Literal(label)))
+        graph.add((work, BF.note, head))
+        loops.append(head)
+    graph.add((loops[0], BF.part, node))
+    graph.add((loops[1], BF.part, node))
+
+    start = time.monotonic()
+    dupes = find_duplicate_bnode_values(graph)
+    assert time.monotonic() - start < 10
+
+    assert {(dup.predicate, dup.copies) for dup in dupes} == {
+        (BF.title, 2),
+        (BF.note, 2),
+    }
+
+
 def test_replace_uri():
     """
     replace_uri rewrites a URI everywhere it appears -- as a subject and as an
@@ -194,6 +288,37 @@ def test_replace_uri():
     assert (other, BF.relatedTo, new) in graph
 
 
+def test_replace_uris():
+    """
+    replace_uris applies several renames at once, including to a statement that
+    mentions two of the old URIs, and leaves everything else alone.
+    """
+    work = URIRef("http://example.com/work")
+    instance = BNode()
+    other = URIRef("http://example.com/other")
+    new_work = URIRef("http://example.com/new-work")
+    new_instance = URIRef("http://example.com/new-instance")
+
+    graph = init_graph()
+    graph.add((work, rdflib.RDF.type, BF.Work))
+    graph.add((instance, rdflib.RDF.type, BF.Instance))
+    graph.add((instance, BF.instanceOf, work))
+    graph.add((other, BF.relatedTo, work))
+    graph.add((other, BF.note, Literal("http://example.com/work")))
+
+    replace_uris(graph, {work: new_work, instance: new_instance})
+
+    assert work not in set(graph.subjects()) | set(graph.objects())
+    assert instance not in set(graph.subjects()) | set(graph.objects())
+    assert (new_work, rdflib.RDF.type, BF.Work) in graph
+    assert (new_instance, rdflib.RDF.type, BF.Instance) in graph
+    assert (new_instance, BF.instanceOf, new_work) in graph
+    assert (other, BF.relatedTo, new_work) in graph
+    # a literal that happens to spell an old URI is not a reference to it
+    assert (other, BF.note, Literal("http://example.com/work")) in graph
+    assert len(graph) == 5
+
+
 def test_bnode_expansion():
     """
     When Work and Instances refer to each other as BNodes we need to ensure we
@@ -230,3 +355,443 @@ def test_bnode_expansion():
     _expand_bnode(batch_graph, entity_graph, work_bnode)
 
     assert len(entity_graph) == 6, "DCTERMS assertions should be ignored"
+
+
+def test_generate_entity_graph_deep_and_wide_bnodes():
+    """
+    Blank nodes are expanded without recursing, so nesting deeper than the
+    recursion limit still works, and each one is expanded once no matter how
+    big the entity graph has grown, so a large description doesn't go quadratic.
+    """
+    graph = init_graph()
+    work = URIRef("http://example.com/work")
+    graph.add((work, rdflib.RDF.type, BF.Work))
+
+    depth = sys.getrecursionlimit() * 2
+    width = 5
+    parent = work
+    for level in range(depth):
+        node = BNode()
+        graph.add((parent, BF.part, node))
+        for i in range(width):
+            leaf = BNode()
+            graph.add((node, BF.note, leaf))
+            graph.add((leaf, rdflib.RDFS.label, Literal(f"{level}.{i}")))
+        parent = node
+
+    # a cycle back up the chain, which must not be followed round again
+    graph.add((parent, BF.partOf, next(graph.objects(work, BF.part))))
+
+    start = time.perf_counter()
+    entity_graph = generate_entity_graph(graph, work)
+    elapsed = time.perf_counter() - start
+
+    assert len(entity_graph) == len(graph)
+    assert elapsed < 10, f"entity extraction took {elapsed:.1f}s"
+
+
+def _relabel_bnodes(doc):
+    """
+    Number blank node identifiers in the order they turn up, walking keys in
+    sorted order, so two framings that differ only in what they called their
+    blank nodes compare equal.
+    """
+    labels: dict[str, str] = {}
+
+    def walk(value):
+        if isinstance(value, dict):
+            return {key: walk(value[key]) for key in sorted(value)}
+        if isinstance(value, list):
+            return [walk(item) for item in value]
+        if isinstance(value, str) and value.startswith("_:"):
+            return labels.setdefault(value, f"_:b{len(labels)}")
+        return value
+
+    return walk(doc)
+
+
+def _load_test_graph(path: Path) -> rdflib.Graph:
+    if path.suffix == ".ttl":
+        return rdflib.Graph().parse(path)
+    with path.open() as fo:
+        return load_jsonld(json.load(fo))
+
+
+@pytest.mark.parametrize(
+    "path", sorted(Path("tests/data").glob("*.*")), ids=lambda path: path.name
+)
+def test_frame_graph_matches_pyld(path):
+    """
+    frame_graph gives what framing the serialized graph with pyld gives, for
+    every resource in the test data, framed from its entity graph as it is when
+    saved and from the whole graph, which embeds the other resources too.
+    """
+    graph = _load_test_graph(path)
+    subjects = [s for s in set(graph.subjects()) if "://" in str(s)]
+    assert subjects
+
+    for subject in subjects:
+        for source in (graph, generate_entity_graph(graph, subject)):
+            expected = frame_jsonld(
+                str(subject), json.loads(source.serialize(format="json-ld"))
+            )
+            framed = frame_graph(str(subject), source)
+            assert isinstance(framed, FramedJsonLD)
+            assert _relabel_bnodes(framed) == _relabel_bnodes(expected)
+
+
+def test_frame_graph_awkward_shapes():
+    """
+    The shapes the test data doesn't have: shared blank nodes and cycles (which
+    keep their identifiers), lists, literals that frame as JSON numbers and
+    booleans, language tags, and terms coerced to @id given literals.
+    """
+    graph = init_graph()
+    work = URIRef("https://bcld.info/works/1")
+    instance = URIRef("https://bcld.info/instances/1")
+    graph.add((work, RDF.type, BF.Work))
+    graph.add((work, RDF.type, BFLC.PrimaryContribution))
+    graph.add((work, BF.hasInstance, instance))
+    graph.add((work, BF.hasInstance, BNode()))
+    graph.add((work, BF.instanceOf, Literal("not a node")))
+    graph.add((instance, RDF.type, BF.Instance))
+    graph.add((instance, BF.instanceOf, work))
+
+    shared = BNode()
+    graph.add((work, BF.title, shared))
+    graph.add((work, BF.note, shared))
+    graph.add((shared, rdflib.RDFS.label, Literal("shared", lang="en-US")))
+    back = BNode()
+    graph.add((work, BF.part, back))
+    graph.add((back, BF.partOf, work))
+    loop = BNode()
+    graph.add((work, BF.relation, loop))
+    graph.add((loop, BF.relation, loop))
+
+    graph.add((work, BF.extent, Literal(5)))
+    graph.add((work, BF.extent, Literal("05", datatype=rdflib.XSD.integer)))
+    graph.add((work, BF.status, Literal(True)))
+    graph.add((work, BF.duration, Literal(1.5)))
+    graph.add((work, BF.date, Literal("2020-01-01", datatype=rdflib.XSD.date)))
+    graph.add((work, BF.code, Literal("x", datatype=rdflib.XSD.string)))
+
+    first, rest, member = BNode(), BNode(), BNode()
+    graph.add((work, BF.contribution, first))
+    graph.add((first, RDF.first, Literal("a")))
+    graph.add((first, RDF.rest, rest))
+    graph.add((rest, RDF.first, member))
+    graph.add((rest, RDF.rest, RDF.nil))
+    graph.add((member, rdflib.RDFS.label, Literal("in a list")))
+    graph.add((work, BF.genreForm, RDF.nil))
+
+    graph.add((work, rdflib.RDFS.seeAlso, rdflib.RDFS.Resource))
+    graph.add((work, URIRef("http://example.com/p"), Literal("elsewhere")))
+
+    for subject in (work, instance):
+        expected = frame_jsonld(
+            str(subject), json.loads(graph.serialize(format="json-ld"))
+        )
+        framed = frame_graph(str(subject), graph)
+        assert _relabel_bnodes(framed) == _relabel_bnodes(expected)
+
+
+def test_frame_jsonld_resolves_context_once(mocker):
+    """
+    CONTEXT is resolved once for the process rather than canonicalized and
+    looked up again on every call.
+    """
+    with Path("tests/data/23807141.jsonld").open() as fo:
+        graph = load_jsonld(json.load(fo))
+    expanded = json.loads(graph.serialize(format="json-ld"))
+    work_uri = "http://id.loc.gov/resources/works/23807141"
+
+    canonicalize = mocker.spy(context_resolver, "canonicalize")
+    framed = [frame_jsonld(work_uri, expanded) for _ in range(3)]
+    assert canonicalize.call_count == 0
+    assert framed[0] == framed[1] == framed[2]
+    assert framed[0]["@context"] == CONTEXT
+
+
+def test_frame_jsonld_document_loader(monkeypatch):
+    """
+    Remote contexts come from the document loader, never the network unless it
+    has a fallback that goes there: by default an unknown one is an error, and
+    whatever the loader is given later is used from then on. A fallback's
+    documents are kept in a small LRU.
+    """
+    context_url = "https://example.com/contexts/bf.jsonld"
+    payload = {
+        "@context": context_url,
+        "@id": "https://bcld.info/works/1",
+        "@type": "Work",
+        "mainTitle": "A title",
+    }
+    remote_doc = {"@context": {"@vocab": str(BF)}}
+
+    connections = []
+    monkeypatch.setattr(
+        socket, "create_connection", lambda *args, **kw: connections.append(args)
+    )
+    monkeypatch.setattr(
+        socket.socket, "connect", lambda *args, **kw: connections.append(args)
+    )
+    # the default loader
+    with pytest.raises(JsonLdError):
+        frame_jsonld("https://bcld.info/works/1", payload)
+    assert connections == []
+
+    loader = DocumentLoader()
+    monkeypatch.setattr(graph_utils, "_document_loader", loader)
+    with pytest.raises(JsonLdError):
+        frame_jsonld("https://bcld.info/works/1", payload)
+    assert connections == []
+
+    loader.add(context_url, remote_doc)
+    framed = frame_jsonld("https://bcld.info/works/1", payload)
+    assert framed["@type"] == "Work"
+    assert framed["mainTitle"] == "A title"
+
+    loader.add(context_url, {"@context": {"@vocab": str(BFLC)}})
+    framed = frame_jsonld("https://bcld.info/works/1", payload)
+    assert framed["@type"] == "bflc:Work"
+
+    fetched = []
+
+    def fallback(url, options):
+        fetched.append(url)
+        return {"contextUrl": None, "documentUrl": url, "document": remote_doc}
+
+    monkeypatch.setattr(
+        graph_utils, "_document_loader", DocumentLoader(fallback=fallback)
+    )
+    framed = frame_jsonld("https://bcld.info/works/1", payload)
+    assert framed["@type"] == "Work"
+    assert fetched == [context_url]
+
+    fetched.clear()
+    loader = DocumentLoader(fallback=fallback, maxsize=2)
+    for url in ["https://a.org/", "https://b.org/", "https://a.org/", "https://c.org/"]:
+        assert loader(url)["document"] == remote_doc
+    # b.org was least recently used when c.org came in
+    loader("https://a.org/")
+    loader("https://b.org/")
+    assert fetched == [
+        "https://a.org/",
+        "https://b.org/",
+        "https://c.org/",
+        "https://b.org/",
+    ]
+
+
+def test_array_store_matches_memory(monkeypatch):
+    """
+    An ArrayStore answers every lookup as rdflib's Memory store does, through
+    adds, removes and bulk loads, and across its reindexing and compacting --
+    which are brought on early here so they happen many times over.
+    """
+    monkeypatch.setattr(store, "_MIN_TAIL", 7)
+    monkeypatch.setattr(store, "_MIN_DEAD", 5)
+
+    rnd = random.Random(4)
+    terms = (
+        [URIRef(f"https://bcld.info/{i}") for i in range(10)]
+        + [Literal(i) for i in range(4)]
+        + [BNode() for _ in range(4)]
+    )
+    subjects = terms[:10] + terms[-4:]
+    predicates = terms[:4]
+
+    def triple():
+        return rnd.choice(subjects), rnd.choice(predicates), rnd.choice(terms)
+
+    def pattern():
+        return (
+            rnd.choice(subjects + [None]),
+            rnd.choice(predicates + [None]),
+            rnd.choice(terms + [None]),
+        )
+
+    memory = rdflib.Graph()
+    compact = compact_graph([])
+    for _ in range(5000):
+        n = rnd.random()
+        if n < 0.02:
+            batch = [triple() for _ in range(rnd.randrange(20))]
+            memory += batch
+            compact.store.load(batch)
+        elif n < 0.5:
+            t = triple()
+            memory.add(t)
+            compact.add(t)
+        elif n < 0.7:
+            p = pattern()
+            memory.remove(p)
+            compact.remove(p)
+        else:
+            p = pattern()
+            found = list(compact.triples(p))
+            assert len(found) == len(set(found))
+            assert set(found) == set(memory.triples(p))
+        assert len(compact) == len(memory)
+
+
+def test_array_store_changed_while_iterating():
+    """
+    Going through an ArrayStore's triples gives the ones that matched when it
+    started, even if triples are added -- and the store compacted -- on the way.
+    """
+    predicate = URIRef("https://bcld.info/p")
+    compact = compact_graph(
+        (URIRef(f"https://bcld.info/{i}"), predicate, Literal(i)) for i in range(40000)
+    )
+    for i in range(40000):
+        if i % 4:
+            compact.remove((URIRef(f"https://bcld.info/{i}"), None, None))
+    before = list(compact.triples((None, predicate, None)))
+
+    found = []
+    for i, triple in enumerate(compact.triples((None, predicate, None))):
+        found.append(triple)
+        for j in range(2):
+            compact.add(
+                (URIRef(f"https://bcld.info/new/{i}/{j}"), predicate, Literal(i))
+            )
+    assert len(compact.store._alive) < 40000, "compacted"
+    assert found == before
+    assert len(compact) == 3 * len(before)
+
+
+def test_compact_graph():
+    """
+    compact_graph and memory_graph copy a graph, namespaces and all, between
+    rdflib's Memory store and an ArrayStore. An ArrayStore gives triples back in
+    the order they were added.
+    """
+    with Path("tests/data/23807141.jsonld").open() as fo:
+        graph = load_jsonld(json.load(fo))
+
+    compact = compact_graph(graph)
+    assert isinstance(compact.store, ArrayStore)
+    assert isomorphic(compact, graph)
+    assert compact.namespace_manager.store.namespace("bf") == URIRef(BF)
+    assert list(compact) == list(graph)
+
+    work_uri = URIRef("http://id.loc.gov/resources/works/23807141")
+    assert isomorphic(
+        generate_entity_graph(compact, work_uri), generate_entity_graph(graph, work_uri)
+    )
+
+    copy = memory_graph(compact)
+    assert not isinstance(copy.store, ArrayStore)
+    assert isomorphic(copy, graph)
+    assert copy.namespace_manager.store.namespace("mads") == URIRef(MADS)
+
+    title = BNode()
+    compact.add((work_uri, BF.title, title))
+    compact.add((title, BF.mainTitle, Literal("A")))
+    compact.add((title, BF.mainTitle, Literal("B")))
+    compact.add((title, BF.mainTitle, Literal("A")))
+    assert list(compact.objects(title, BF.mainTitle)) == [Literal("A"), Literal("B")]
+    compact.remove((title, None, None))
+    assert (title, None, None) not in compact
+    assert len(compact) == len(graph) + 1
+
+
+def test_metrics_registry_render(tmp_path):
+    registry = metrics.Registry()
+    saves = registry.counter("saves_total", "Saves.", ["outcome"])
+    saves.inc(outcome="committed")
+    saves.inc(2, outcome="committed")
+    registry.counter("saves_total", "Saves.", ["outcome"]).inc(outcome='a "b"\n')
+    duration = registry.histogram("save_seconds", "Save time.", buckets=[0.1, 1])
+    for seconds in (0.05, 0.5, 0.5, 3):
+        duration.observe(seconds)
+
+    assert saves.value(outcome="committed") == 3
+    assert duration.count() == 4
+    assert registry.render() == (
+        "# HELP save_seconds Save time.\n"
+        "# TYPE save_seconds histogram\n"
+        'save_seconds_bucket{le="0.1"} 1\n'
+        'save_seconds_bucket{le="1.0"} 3\n'
+        'save_seconds_bucket{le="+Inf"} 4\n'
+        "save_seconds_sum 4.05\n"
+        "save_seconds_count 4\n"
+        "# HELP saves_total Saves.\n"
+        "# TYPE saves_total counter\n"
+        'saves_total{outcome="a \\"b\\"\\n"} 1.0\n'
+        'saves_total{outcome="committed"} 3.0\n'
+    )
+
+    registry.write(tmp_path / "bluecore.prom")
+    assert (tmp_path / "bluecore.prom").read_text() == registry.render()
+    assert [p.name for p in tmp_path.iterdir()] == ["bluecore.prom"]
+
+    with pytest.raises(ValueError):
+        saves.inc(kind="works")
+    with pytest.raises(ValueError):
+        registry.histogram("saves_total", "Saves.", ["outcome"])
+
+    null = metrics.NullRegistry()
+    null.counter("saves_total", "Saves.", ["outcome"]).inc(outcome="committed")
+    null.histogram("save_seconds", "Save time.").observe(1.0)
+    assert null.render() == ""
+
+
+def test_normalize_statement():
+    normalize = sql_profile.normalize_statement
+    assert (
+        normalize(
+            "SELECT resource_base.id FROM resource_base\n"
+            "WHERE resource_base.uri IN (%(uri_1_1)s, %(uri_1_2)s, %(uri_1_3)s)"
+        )
+        == "SELECT resource_base.id FROM resource_base "
+        "WHERE resource_base.uri IN (...)"
+    )
+    assert normalize(
+        "INSERT INTO versions (resource_id, data) VALUES "
+        "(%(resource_id__0)s, %(data__0)s), (%(resource_id__1)s, %(data__1)s)"
+    ) == normalize("INSERT INTO versions (resource_id, data) VALUES (%s, %s)")
+    assert (
+        normalize("SELECT uri_2 FROM t WHERE x = 'it''s' AND y > 10 LIMIT 1")
+        == "SELECT uri_2 FROM t WHERE x = ? AND y > ? LIMIT ?"
+    )
+
+
+def test_statement_profiler(engine):
+    from sqlalchemy import text
+
+    with sql_profile.StatementProfiler(engine) as profiler, engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with sql_profile.statement_stats() as profile:
+            for i in range(3):
+                conn.execute(text("SELECT :x"), {"x": i})
+
+    assert profile.statements.keys() == {"SELECT ?"}
+    assert profile.calls == 3
+    stats = profiler.profile.statements["SELECT ?"]
+    assert stats.calls == 4
+    assert 0 < stats.percentile(50) <= stats.percentile(99) <= stats.max
+    assert stats.max <= stats.total
+    assert "SELECT ?" in profiler.profile.format()
+
+    # closed, it no longer listens
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert profiler.profile.calls == 4
+
+
+def test_uuid7(engine):
+    from sqlalchemy import text
+
+    start = time.time_ns() // 1_000_000
+    minted = [uuids.uuid7() for _ in range(5000)]
+    assert all(uuid.version == 7 for uuid in minted)
+    assert minted == sorted(minted), "made in order, even within a millisecond"
+    assert len(set(minted)) == len(minted)
+    assert start <= minted[0].int >> 80 <= time.time_ns() // 1_000_000
+
+    with engine.connect() as conn:
+        uuid = conn.execute(text(f"SELECT {uuids.UUID7_SQL}")).scalar()
+    assert uuid.version == 7
+    assert start <= uuid.int >> 80 <= time.time_ns() // 1_000_000